@@ -32,6 +32,8 @@ setuptools.setup(
           'sympy==1.4',
           'networkx',
           'cloudpickle',
-          'matplotlib'
+          'matplotlib',
+          'numpy',
+          'scipy'
       ],
 )
\ No newline at end of file
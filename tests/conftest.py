@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# Standard library imports
+import os
+import sys
+import types
+import warnings
+
+# 3rd party library imports
+import numpy as np
+import pytest
+
+###############################################################################
+###############################################################################
+
+# The generated spatial fourbar numerical model used as the reference model of
+# the numerics tests, which needs the `smbd.numenv` numerical environment,
+# falling back to the helpers vendored in `numenv.py` if not installed.
+FOURBAR_SRC = os.path.join(os.path.dirname(__file__), '..', 'uraeus', 'smbd',
+                           'utilities', 'serialization', 'structural', 'test',
+                           'numenv', 'python', 'src')
+
+# The actuator row-block of the generated fourbar jacobian, and its scalar
+# row in the lagrange multipliers vector.
+ACTUATOR_BLOCK = 3
+ACTUATOR_ROW = 5
+
+
+def _install_numenv():
+    try:
+        import smbd.numenv.python.numerics.core.math_funcs
+    except ImportError:
+        import numenv
+        core = 'smbd.numenv.python.numerics.core'
+        for name in ('math_funcs', 'math_funcs.misc', 'shared_classes'):
+            sys.modules.setdefault('%s.%s'%(core, name), numenv)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        try:
+            import scipy.misc as misc
+        except ImportError:
+            misc = sys.modules['scipy.misc'] = types.ModuleType('scipy.misc')
+    if not hasattr(misc, 'derivative'):
+        import numenv
+        misc.derivative = numenv.derivative
+
+
+def _import_fourbar():
+    _install_numenv()
+    if FOURBAR_SRC not in sys.path:
+        sys.path.insert(0, FOURBAR_SRC)
+    import spatial_fourbar
+    import spatial_fourbar_cfg
+    return spatial_fourbar, spatial_fourbar_cfg
+
+
+def crank_angle(t):
+    return -np.deg2rad(360) * t
+
+
+def fourbar(actuation=None, **points):
+    """
+    Create an instance of the generated spatial fourbar numerical model, with
+    its configuration assembled.
+
+    Parameters
+    ----------
+    actuation : callable, optional
+        The crank angle as a function of time. Defaults to a zero angle.
+    **points
+        The coordinates of the hard points to override, e.g. `hps_c`.
+    """
+    model_module, config_module = _import_fourbar()
+    inputs = config_module.inputs('fourbar')
+    inputs.hps_a = np.array([[0], [0], [0]], dtype=np.float64)
+    inputs.hps_b = np.array([[0], [0], [200]], dtype=np.float64)
+    inputs.hps_c = np.array([[-750], [-850], [650]], dtype=np.float64)
+    inputs.hps_d = np.array([[-400], [-850], [0]], dtype=np.float64)
+    inputs.vcs_x = np.array([[1], [0], [0]], dtype=np.float64)
+    inputs.vcs_y = np.array([[0], [1], [0]], dtype=np.float64)
+    inputs.vcs_z = np.array([[0], [0], [1]], dtype=np.float64)
+    inputs.s_links_ro = 20.0
+    for name, value in points.items():
+        setattr(inputs, name, np.array(value, dtype=np.float64).reshape(3, 1))
+    if actuation is not None:
+        inputs.UF_mcs_act = actuation
+
+    config = config_module.configuration()
+    config.assemble(inputs)
+    model = model_module.topology()
+    model.config = config
+    return model
+
+
+class free_fourbar(object):
+    """
+    A view of the generated spatial fourbar model without its actuator, i.e.
+    a single degree-of-freedom mechanism swinging under gravity.
+    """
+
+    def __init__(self, model):
+        self.__dict__['_model'] = model
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._model, name, value)
+
+    @property
+    def nc(self):
+        return self._model.nc - 1
+
+    @property
+    def jac_rows(self):
+        rows = np.asarray(self._model.jac_rows)
+        rows = rows[rows != ACTUATOR_BLOCK]
+        return np.where(rows > ACTUATOR_BLOCK, rows - 1, rows)
+
+    @property
+    def jac_cols(self):
+        rows = np.asarray(self._model.jac_rows)
+        return np.asarray(self._model.jac_cols)[rows != ACTUATOR_BLOCK]
+
+    @property
+    def pos_eq_blocks(self):
+        return self._drop(self._model.pos_eq_blocks)
+
+    @property
+    def vel_eq_blocks(self):
+        return self._drop(self._model.vel_eq_blocks)
+
+    @property
+    def acc_eq_blocks(self):
+        return self._drop(self._model.acc_eq_blocks)
+
+    @property
+    def jac_eq_blocks(self):
+        rows = self._model.jac_rows
+        blocks = self._model.jac_eq_blocks
+        return tuple(b for b, r in zip(blocks, rows) if r != ACTUATOR_BLOCK)
+
+    def set_lagrange_multipliers(self, Lambda):
+        Lambda = np.insert(Lambda, ACTUATOR_ROW, 0.0, axis=0)
+        self._model.set_lagrange_multipliers(Lambda)
+
+    @staticmethod
+    def _drop(blocks):
+        return tuple(b for i, b in enumerate(blocks) if i != ACTUATOR_BLOCK)
+
+
+@pytest.fixture
+def make_fourbar():
+    """
+    A factory of new instances of the fourbar model, either driven by a full
+    crank revolution per second or swinging freely under gravity.
+    """
+    def factory(driven=False, free=False, **points):
+        model = fourbar(crank_angle if driven else None, **points)
+        if free:
+            model = free_fourbar(model)
+            model.initialize()
+        return model
+    return factory
+
+
+@pytest.fixture
+def driven_fourbar():
+    """
+    The fully-constrained fourbar, driven by a full crank revolution per
+    second.
+    """
+    return fourbar(crank_angle)
+
+
+@pytest.fixture
+def swinging_fourbar():
+    """
+    The single degree-of-freedom fourbar, swinging under gravity.
+    """
+    model = free_fourbar(fourbar())
+    model.initialize()
+    return model
+
+
+@pytest.fixture
+def fourbar_classes():
+    """
+    The generated topology, inputs and configuration classes of the fourbar.
+    """
+    model_module, config_module = _import_fourbar()
+    return (model_module.topology, config_module.inputs,
+            config_module.configuration)
+
+
+@pytest.fixture(scope='session')
+def fourbar_topology():
+    """
+    The symbolic topology of the generated spatial fourbar model.
+    """
+    systems = pytest.importorskip('uraeus.smbd.systems')
+    model = systems.standalone_topology('spatial_fourbar')
+    model.add_body('l1')
+    model.add_body('l2')
+    model.add_body('l3')
+    model.add_joint.revolute('a', 'ground', 'rbs_l1')
+    model.add_joint.spherical('b', 'rbs_l1', 'rbs_l2')
+    model.add_joint.universal('c', 'rbs_l2', 'rbs_l3')
+    model.add_joint.revolute('d', 'rbs_l3', 'ground')
+    model.add_actuator.rotational_actuator('act', 'jcs_a')
+    model.assemble()
+    return model
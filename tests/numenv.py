@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+
+# Local applicataion imports
+from uraeus.smbd.numerics import math_funcs
+from uraeus.smbd.numerics.configuration import mirrored, centered, oriented
+from uraeus.smbd.numerics.geometries import (cylinder_geometry,
+                                             triangular_prism,
+                                             sphere_geometry,
+                                             composite_geometry)
+
+###############################################################################
+# The few helpers of the `smbd.numenv` numerical environment used by the
+# generated spatial fourbar model and its configuration, where the model
+# passes the vectors as column vectors of shape (3, 1) and (4, 1).
+###############################################################################
+
+def _vector(v):
+    return np.ravel(np.asarray(v, dtype=np.float64))
+
+def skew(v):
+    return math_funcs.skew(_vector(v))
+
+def G(P):
+    return math_funcs.G(_vector(P))
+
+def E(P):
+    return math_funcs.E(_vector(P))
+
+def A(P):
+    return math_funcs.A(_vector(P))
+
+def B(P, u):
+    return math_funcs.B(_vector(P), _vector(u))
+
+def triad(v1, v2=None):
+    return math_funcs.triad(_vector(v1), None if v2 is None else _vector(v2))
+
+
+class config_inputs(object):
+    pass
+
+
+def derivative(func, x0, dx=1.0, n=1):
+    """
+    The central-difference derivative of the given order of a scalar function,
+    replacing `scipy.misc.derivative` that is removed in SciPy 1.12.
+    """
+    if n == 1:
+        return (func(x0 + dx) - func(x0 - dx)) / (2*dx)
+    elif n == 2:
+        return (func(x0 + dx) - 2*func(x0) + func(x0 - dx)) / dx**2
+    raise ValueError('Derivatives of order %s are not supported.'%n)
+
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import pytest
+
+# Local applicataion imports
+from uraeus.smbd.numerics.configuration import configuration_evaluator
+
+###############################################################################
+###############################################################################
+
+HARDPOINTS = {'hps_a': [0, 0, 0], 'hps_b': [0, 0, 200],
+              'hps_c': [-750, -850, 650], 'hps_d': [-400, -850, 0],
+              'vcs_x': [1, 0, 0], 'vcs_y': [0, 1, 0], 'vcs_z': [0, 0, 1],
+              's_l1_ro': 10.0, 's_l2_ro': 20.0, 's_l3_ro': 30.0}
+
+
+@pytest.fixture(scope='module')
+def evaluator(fourbar_topology):
+    """
+    The evaluator of a fourbar configuration, with a cylinder geometry of a
+    distinct radius on each link.
+    """
+    systems = pytest.importorskip('uraeus.smbd.systems')
+    config = systems.configuration('fourbar_cfg', fourbar_topology)
+    for name in 'abcd':
+        config.add_point.UserInput(name)
+    for name in 'xyz':
+        config.add_vector.UserInput(name)
+    config.add_relation.Equal_to('pt1_jcs_a', ('hps_a',))
+    config.add_relation.Equal_to('ax1_jcs_a', ('vcs_x',))
+    config.add_relation.Equal_to('pt1_jcs_b', ('hps_b',))
+    config.add_relation.Equal_to('ax1_jcs_b', ('vcs_z',))
+    config.add_relation.Equal_to('pt1_jcs_c', ('hps_c',))
+    config.add_relation.Oriented('ax1_jcs_c', ('hps_b', 'hps_c'))
+    config.add_relation.Oriented('ax2_jcs_c', ('hps_c', 'hps_b'))
+    config.add_relation.Equal_to('pt1_jcs_d', ('hps_d',))
+    config.add_relation.Equal_to('ax1_jcs_d', ('vcs_y',))
+    for link, (p1, p2) in zip(('l1', 'l2', 'l3'), ('ab', 'bc', 'cd')):
+        config.add_scalar.UserInput('%s_ro'%link)
+        config.add_geometry.Cylinder_Geometry(link, ('hps_%s'%p1, 'hps_%s'%p2,
+                                                     's_%s_ro'%link))
+        config.assign_geometry_to_body('rbs_%s'%link, 'gms_%s'%link)
+    return configuration_evaluator(config)
+
+
+def _assert_batch(evaluator, inputs, batched, n_samples):
+    """
+    Assert the batched evaluation against the evaluation of each sample.
+    """
+    batch = evaluator.evaluate_batch(inputs)
+    for k in range(n_samples):
+        sample = dict(inputs, **{name: inputs[name][k] for name in batched})
+        values = evaluator.evaluate(sample)
+        for node, value in values.items():
+            if callable(value):
+                continue
+            if hasattr(value, 'm'):
+                for attr in ('volume', 'R', 'P', 'm', 'J'):
+                    np.testing.assert_allclose(getattr(batch[node], attr)[k],
+                                               getattr(value, attr),
+                                               rtol=1e-12, err_msg=node)
+            else:
+                np.testing.assert_allclose(batch[node][k], value,
+                                           rtol=1e-12, err_msg=node)
+
+
+@pytest.mark.parametrize('n_samples', [1, 2, 3, 4, 5])
+def test_batched_hardpoint(evaluator, n_samples):
+    inputs = dict(HARDPOINTS)
+    offsets = np.arange(n_samples)[:, None] * [10, -5, 20]
+    inputs['hps_b'] = np.array(HARDPOINTS['hps_b']) + offsets
+    _assert_batch(evaluator, inputs, ['hps_b'], n_samples)
+
+
+@pytest.mark.parametrize('n_samples', [2, 3, 4])
+def test_batched_scalar(evaluator, n_samples):
+    inputs = dict(HARDPOINTS)
+    inputs['s_l2_ro'] = 20.0 + 5*np.arange(n_samples)
+    _assert_batch(evaluator, inputs, ['s_l2_ro'], n_samples)
+
+
+def test_batched_inputs(evaluator):
+    n_samples = 3
+    inputs = dict(HARDPOINTS)
+    inputs['hps_c'] = np.array(HARDPOINTS['hps_c']) + np.arange(9).reshape(3, 3)
+    inputs['s_l1_ro'] = [5.0, 15.0, 25.0]
+    _assert_batch(evaluator, inputs, ['hps_c', 's_l1_ro'], n_samples)
+
+    batch = evaluator.evaluate_batch(inputs)
+    assert batch['gms_l1'].m.shape == (n_samples,)
+    assert batch['gms_l2'].J.shape == (n_samples, 3, 3)
+    assert batch['hps_a'].shape == (n_samples, 3, 1)
+    assert batch['s_l3_ro'].shape == (n_samples,)
+
+
+def test_batched_columns(evaluator):
+    # the batched vectors may be given as rows or as column vectors.
+    rows = np.array(HARDPOINTS['hps_d']) + np.arange(12).reshape(4, 3)
+    batch = evaluator.evaluate_batch(dict(HARDPOINTS, hps_d=rows))
+    columns = evaluator.evaluate_batch(dict(HARDPOINTS, hps_d=rows[..., None]))
+    np.testing.assert_array_equal(batch['gms_l3'].R, columns['gms_l3'].R)
+    np.testing.assert_array_equal(batch['pt1_jcs_d'], rows[..., None])
+
+
+def test_batched_samples_mismatch(evaluator):
+    inputs = dict(HARDPOINTS, hps_b=np.zeros((2, 3)), s_l2_ro=np.ones(3))
+    with pytest.raises(ValueError, match='Inconsistent number of samples'):
+        evaluator.evaluate_batch(inputs)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import pytest
+
+# Local applicataion imports
+from uraeus.smbd.numerics.solvers import (kinematic_solver, dynamic_solver,
+                                          partitioned_solver)
+
+###############################################################################
+###############################################################################
+
+def _velocity_residual(solver, i):
+    model = solver.model
+    model.t = solver.time_history[i]
+    model.set_gen_coordinates(solver.pos_history[i])
+    model.set_gen_velocities(solver.vel_history[i])
+    jac = solver._eval_jac_eq()
+    return jac.dot(solver.vel_history[i]) + solver._eval_vel_eq()
+
+
+def test_driven_fourbar_follows_kinematics(make_fourbar):
+    duration, spacing = 0.5, 0.001
+    kinematics = kinematic_solver(make_fourbar(driven=True))
+    kinematics.solve(duration, spacing)
+    dynamics = dynamic_solver(make_fourbar(driven=True), alpha=-0.1)
+    dynamics.solve(duration, spacing)
+
+    i = len(dynamics.time_array) - 1
+    assert i == len(kinematics.time_array) - 1
+    assert np.abs(dynamics.pos_history[i] - kinematics.pos_history[i]).max() < 1e-3
+    assert np.abs(dynamics.vel_history[i] - kinematics.vel_history[i]).max() < 1e-1
+
+
+def test_initial_velocities_projection(make_fourbar):
+    reference = dynamic_solver(make_fourbar(free=True))
+    reference.solve(0.05, 0.001)
+
+    model = make_fourbar(free=True)
+    qd0 = np.zeros((model.n, 1))
+    qd0[7:10, 0] = [100, 50, -30]
+    model.qd0 = qd0
+    solver = dynamic_solver(model)
+    solver.solve(0.05, 0.001)
+
+    assert np.abs(_velocity_residual(solver, 0)).max() < 1e-8
+    max_acc = max(np.abs(a).max() for a in solver.acc_history.values())
+    ref_acc = max(np.abs(a).max() for a in reference.acc_history.values())
+    assert max_acc < 2 * ref_acc
+
+
+@pytest.mark.parametrize('adaptive', [False, True])
+def test_constraints_drift(swinging_fourbar, adaptive):
+    solver = dynamic_solver(swinging_fourbar)
+    solver.solve(0.5, 0.005, adaptive=adaptive)
+    model = solver.model
+    for i in solver.pos_history:
+        model.t = solver.time_history[i]
+        model.set_gen_coordinates(solver.pos_history[i])
+        assert np.abs(solver._eval_pos_eq()).max() < 1e-5
+
+
+def test_partitioned_agrees_with_hht(make_fourbar):
+    duration = 0.3
+    hht = dynamic_solver(make_fourbar(free=True), alpha=0.0)
+    hht.solve(duration, 0.0005)
+    partitioned = partitioned_solver(make_fourbar(free=True), rtol=1e-8,
+                                     atol=1e-8)
+    partitioned.solve(duration, 0.01)
+
+    i = len(hht.time_array) - 1
+    k = len(partitioned.time_array) - 1
+    assert abs(hht.time_history[i] - partitioned.time_array[k]) < 1e-12
+    assert np.abs(hht.pos_history[i] - partitioned.pos_history[k]).max() < 5e-2
+    assert np.abs(hht.vel_history[i] - partitioned.vel_history[k]).max() < 1
+
+    # the dependent coordinates jacobian factorization is reused across the
+    # evaluations of the ODE system.
+    assert partitioned.factorizations < partitioned.evaluations / 5
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_partitioned_implicit_integrator(swinging_fourbar):
+    solver = partitioned_solver(swinging_fourbar, method='Radau')
+    solver.solve(0.3, 0.01)
+    k = len(solver.time_array) - 1
+    assert np.all(np.isfinite(solver.pos_history[k]))
+
+    # the overflowing states probed by the integrator are rejected by
+    # non-finite derivatives.
+    states = 1e300 * solver._independent_states()
+    derivatives = solver._eval_ode_system(solver.time_array[k], states)
+    assert np.all(np.isnan(derivatives))
+
+
+def test_partitioned_convergence_error(swinging_fourbar):
+    solver = partitioned_solver(swinging_fourbar, max_iterations=1)
+    with pytest.raises(RuntimeError, match='did not converge at t = ') as error:
+        solver.solve(0.3, 0.01)
+    assert type(error.value) is RuntimeError
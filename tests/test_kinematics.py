@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import pytest
+
+# Local applicataion imports
+from uraeus.smbd.numerics.solvers import kinematic_solver
+
+###############################################################################
+###############################################################################
+
+DURATION = 1.0
+SPACING  = 0.005
+
+# the relative tolerance of the central differences, of O(h**2) error.
+FD_TOL = 5e-3
+
+
+@pytest.fixture
+def solver(driven_fourbar):
+    solver = kinematic_solver(driven_fourbar, tol=1e-9)
+    solver.solve(DURATION, SPACING, lagrange_multipliers=True)
+    return solver
+
+
+def _history(history):
+    return np.hstack([history[i] for i in sorted(history)])
+
+
+def test_position_residual(solver):
+    model = solver.model
+    for i, t in enumerate(solver.time_array):
+        model.t = t
+        model.set_gen_coordinates(solver.pos_history[i])
+        model.eval_pos_eq()
+        residual = np.concatenate(model.pos_eq_blocks)
+        assert np.abs(residual).max() < 1e-8
+
+
+def test_velocities_finite_differences(solver):
+    q  = _history(solver.pos_history)
+    qd = _history(solver.vel_history)
+    fd = (q[:, 2:] - q[:, :-2]) / (2 * SPACING)
+    scale = np.abs(qd).max()
+    assert np.abs(fd - qd[:, 1:-1]).max() < FD_TOL * scale
+
+
+def test_accelerations_finite_differences(solver):
+    qd  = _history(solver.vel_history)
+    qdd = _history(solver.acc_history)
+    fd = (qd[:, 2:] - qd[:, :-2]) / (2 * SPACING)
+    scale = np.abs(qdd).max()
+    assert np.abs(fd - qdd[:, 1:-1]).max() < FD_TOL * scale
+
+
+def test_factorizations_reuse(solver):
+    nsteps = len(solver.time_array)
+    assert solver.total_factorizations < nsteps
+    assert solver.iterations.max() < solver.max_iterations
+
+
+def test_not_fully_constrained(swinging_fourbar):
+    with pytest.raises(ValueError):
+        kinematic_solver(swinging_fourbar)
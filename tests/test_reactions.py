@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import pytest
+
+# Local applicataion imports
+from uraeus.smbd.numerics.solvers import kinematic_solver
+from uraeus.smbd.numerics.reactions import reactions_evaluator
+
+###############################################################################
+###############################################################################
+
+@pytest.fixture
+def solver(driven_fourbar):
+    solver = kinematic_solver(driven_fourbar)
+    solver.solve(0.5, 0.01, lagrange_multipliers=True)
+    return solver
+
+
+def test_reactions_against_model(fourbar_topology, solver):
+    model = solver.model
+    L_jcs_c = model.L_jcs_c
+    evaluator = reactions_evaluator(fourbar_topology, model)
+    # the lagrange multipliers of the model are left unchanged.
+    assert model.L_jcs_c is L_jcs_c
+    assert sorted(evaluator.reactions_names) == sorted(model.reactions_indicies)
+
+    steps = sorted(solver.pos_history)
+    pos = np.hstack([solver.pos_history[i] for i in steps]).T
+    lagrange = np.hstack([solver.lagrange_multipliers[i] for i in steps]).T
+    reactions = evaluator.evaluate(solver.time_array, pos, lagrange)
+    # the round-off errors of the vanishing reactions, evaluated from the
+    # cancellation of large terms, scale with the magnitude of all reactions.
+    scale = max(np.abs(values).max() for values in reactions.values())
+
+    for i in steps:
+        model.t = solver.time_array[i]
+        model.set_gen_coordinates(solver.pos_history[i])
+        model.set_lagrange_multipliers(solver.lagrange_multipliers[i])
+        model.eval_reactions_eq()
+        for name in evaluator.reactions_names:
+            expected = np.ravel(model.reactions[name])
+            tol = 1e-8 * np.abs(reactions[name]).max() + 1e-15 * scale
+            assert np.abs(reactions[name][i] - expected).max() < tol
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# Local applicataion imports
+from uraeus.smbd.utilities.diagnostics.redundancy import redundancy_analysis
+
+###############################################################################
+###############################################################################
+
+def test_spatial_fourbar(fourbar_topology, driven_fourbar):
+    analysis = redundancy_analysis(fourbar_topology, driven_fourbar)
+    assert analysis.rank == driven_fourbar.nc
+    assert not analysis.is_redundant
+    assert 'Inconclusive' not in analysis.report()
+
+
+def test_planar_fourbar(fourbar_topology, make_fourbar):
+    # the parallel revolute axes of a planar fourbar make one of the joints
+    # rows redundant.
+    model = make_fourbar(hps_c=[0, -850, 650], hps_d=[0, -850, 0])
+    analysis = redundancy_analysis(fourbar_topology, model)
+    assert analysis.rank_deficiency == 1
+    assert [r['constraint'] for r in analysis.redundant_rows] == ['jcs_d']
+    assert 'Inconclusive' not in analysis.report()
+
+
+def test_rows_scaling(fourbar_topology, make_fourbar):
+    # the analysis is invariant to the length units of the model, here in km.
+    model = make_fourbar(hps_c=[0, -850, 650], hps_d=[0, -850, 0])
+    scaled = make_fourbar(hps_b=[0, 0, 2e-4], hps_c=[0, -8.5e-4, 6.5e-4],
+                          hps_d=[0, -8.5e-4, 0])
+    analysis = redundancy_analysis(fourbar_topology, model)
+    scaled_analysis = redundancy_analysis(fourbar_topology, scaled)
+    assert scaled_analysis.rank == analysis.rank
+    assert scaled_analysis.redundant_rows == analysis.redundant_rows
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import pytest
+
+# Local applicataion imports
+from uraeus.smbd.numerics.solvers import kinematic_solver
+from uraeus.smbd.numerics.results import (lagrange_indicies, results_writer,
+                                          results_reader)
+
+###############################################################################
+###############################################################################
+
+@pytest.fixture
+def solver(driven_fourbar):
+    solver = kinematic_solver(driven_fourbar)
+    solver.solve(0.5, 0.01, lagrange_multipliers=True)
+    return solver
+
+
+def _reactions(model, solver, i):
+    model.t = solver.time_array[i]
+    model.set_gen_coordinates(solver.pos_history[i])
+    model.set_lagrange_multipliers(solver.lagrange_multipliers[i])
+    model.eval_reactions_eq()
+    return model.reactions
+
+
+def test_lagrange_indicies(solver):
+    model = solver.model
+    state = {k: v for k, v in vars(model).items() if k.startswith('L_')}
+
+    indicies = lagrange_indicies(model)
+    assert indicies == {'jcs_a': [0, 5], 'mcs_act': [5, 6], 'jcs_b': [6, 9],
+                        'jcs_c': [9, 13], 'jcs_d': [13, 18]}
+
+    # the lagrange multipliers of the model are not overwritten by the probe.
+    after = {k: v for k, v in vars(model).items() if k.startswith('L_')}
+    assert after.keys() == state.keys()
+    for name, value in state.items():
+        assert after[name] is value
+
+
+def test_round_trip(solver, tmp_path):
+    model = solver.model
+    directory = str(tmp_path / 'results')
+    with results_writer(directory, model, capacity=16, chunk_size=10) as writer:
+        for i in sorted(solver.pos_history):
+            writer.append(solver.time_array[i], solver.pos_history[i],
+                          solver.vel_history[i], solver.acc_history[i],
+                          solver.lagrange_multipliers[i],
+                          _reactions(model, solver, i))
+
+    results = results_reader(directory)
+    nsteps = len(solver.time_array)
+    assert results.count == nsteps
+    assert results.index['capacity'] >= nsteps
+    assert np.array_equal(results.time, solver.time_array)
+    for i in range(nsteps):
+        assert np.array_equal(results.series['pos'][i], solver.pos_history[i][:, 0])
+        assert np.array_equal(results.body('rbs_l2', 'acc')[i],
+                              solver.acc_history[i][14:21, 0])
+        assert np.array_equal(results['jcs_c'][i],
+                              solver.lagrange_multipliers[i][9:13, 0])
+        reactions = _reactions(model, solver, i)
+        assert np.array_equal(results.reaction('T_rbs_l3_jcs_d')[i],
+                              np.ravel(reactions['T_rbs_l3_jcs_d']))
+
+
+def test_interrupted_growth(solver, tmp_path, monkeypatch):
+    model = solver.model
+    directory = str(tmp_path / 'results')
+    writer = results_writer(directory, model, capacity=16, chunk_size=10)
+    steps = sorted(solver.pos_history)
+    for i in steps[:10]:
+        writer.append(solver.time_array[i], solver.pos_history[i])
+
+    def open_memmap(*args, **kwargs):
+        raise OSError('No space left on device')
+    monkeypatch.setattr(np.lib.format, 'open_memmap', open_memmap)
+    with pytest.raises(OSError):
+        for i in steps[10:20]:
+            writer.append(solver.time_array[i], solver.pos_history[i])
+    monkeypatch.undo()
+
+    # the flushed time steps are kept by the original files.
+    results = results_reader(directory)
+    assert results.count == 10
+    for i in steps[:10]:
+        assert np.array_equal(results.series['pos'][i], solver.pos_history[i][:, 0])
+
+
+def test_append_solver(solver, tmp_path):
+    directory = str(tmp_path / 'results')
+    writer = results_writer(directory, solver.model)
+    writer.append_solver(solver)
+    writer.close()
+
+    results = results_reader(directory)
+    assert sorted(results.series) == ['acc', 'lagrange', 'pos', 'time', 'vel']
+    assert results.body('rbs_l3', 'vel').shape == (len(solver.time_array), 7)
+
+
+def test_append_series_mismatch(solver, tmp_path):
+    writer = results_writer(str(tmp_path / 'results'), solver.model)
+    q, qd = solver.pos_history[0], solver.vel_history[0]
+    Lambda = solver.lagrange_multipliers[0]
+    writer.append(0.0, q, qd, Lambda=Lambda)
+    with pytest.raises(ValueError, match='missing'):
+        writer.append(0.01, q, qd)
+    with pytest.raises(ValueError, match='unexpected'):
+        writer.append(0.01, q, qd, solver.acc_history[0], Lambda)
+    writer.append(0.01, q, qd, Lambda=Lambda)
+    writer.close()
+    assert results_reader(str(tmp_path / 'results')).count == 2
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import pytest
+
+# Local applicataion imports
+from uraeus.smbd.numerics.sweeps import sweep_runner
+
+###############################################################################
+###############################################################################
+
+INPUTS = {'hps_a': [0, 0, 0], 'hps_b': [0, 0, 200], 'hps_c': [-750, -850, 650],
+          'hps_d': [-400, -850, 0], 'vcs_x': [1, 0, 0], 'vcs_y': [0, 1, 0],
+          'vcs_z': [0, 0, 1], 's_links_ro': 20.0}
+
+
+def _input_sets(n):
+    return [dict(INPUTS, hps_c=[-750, -850, 650 + 10*i]) for i in range(n)]
+
+
+def test_resume_checkpoint(fourbar_classes, tmp_path):
+    runner = sweep_runner(*fourbar_classes, processes=0, checkpoint=str(tmp_path))
+    results = dict(runner.run(_input_sets(2), 0.05, 0.01))
+    assert sorted(results) == [0, 1]
+
+    resumed = sweep_runner(*fourbar_classes, processes=0,
+                           checkpoint=str(tmp_path))
+    assert resumed.completed == {0, 1}
+    assert dict(resumed.run(_input_sets(3), 0.05, 0.01)).keys() == {2}
+    np.testing.assert_array_equal(resumed.load(1)['pos'], results[1]['pos'])
+
+
+def test_checkpoint_analysis_mismatch(fourbar_classes, tmp_path):
+    runner = sweep_runner(*fourbar_classes, processes=0, checkpoint=str(tmp_path))
+    list(runner.run(_input_sets(1), 0.05, 0.01))
+    with pytest.raises(ValueError, match="analysis 'kinematic' does not match"):
+        sweep_runner(*fourbar_classes, analysis='dynamic', processes=0,
+                     checkpoint=str(tmp_path))
+
+
+@pytest.mark.parametrize('duration, spacing', [(0.1, 0.01), (0.05, 0.005)])
+def test_checkpoint_parameters_mismatch(fourbar_classes, tmp_path, duration,
+                                        spacing):
+    runner = sweep_runner(*fourbar_classes, processes=0, checkpoint=str(tmp_path))
+    list(runner.run(_input_sets(1), 0.05, 0.01))
+    resumed = sweep_runner(*fourbar_classes, processes=0,
+                           checkpoint=str(tmp_path))
+    with pytest.raises(ValueError, match='parameters .* do not match'):
+        resumed.run(_input_sets(2), duration, spacing)
+    assert resumed.completed == {0}
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import sympy as sm
+import numpy as np
+import networkx as nx
+
+# Local applicataion imports
+from . import geometries
+from ..symbolic.systems import configuration_classes as cfg_cls
+from ..symbolic.components.forces import abstract_force
+
+###############################################################################
+# Numerical implementations of the configuration relations, operating on the
+# column vectors of shape (..., n, 1) used by the configuration values.
+###############################################################################
+
+_mirror_vector = np.array([[1.], [-1.], [1.]])
+_mirror_quaternion = np.array([[1.], [-1.], [1.], [-1.]])
+
+def equal_to(v):
+    return v
+
+def mirrored(v):
+    """
+    Mirror a value about the global XZ-plane, where vectors are reflected,
+    and orientations and inertia tensors are transformed accordingly.
+    """
+    v = np.asarray(v, dtype=np.float64)
+    shape = v.shape[-2:]
+    if shape == (3, 1):
+        return _mirror_vector * v
+    elif shape == (4, 1):
+        return _mirror_quaternion * v
+    elif shape == (3, 3):
+        return _mirror_vector * v * _mirror_vector.T
+    return v
+
+def centered(*args):
+    return sum(np.asarray(v, dtype=np.float64) for v in args) / len(args)
+
+def oriented(*args):
+    """
+    A unit vector oriented along two points, or normal to the plane of three
+    points.
+    """
+    args = [np.asarray(v, dtype=np.float64) for v in args]
+    if len(args) == 2:
+        v = args[1] - args[0]
+    elif len(args) == 3:
+        a1 = args[1] - args[0]
+        a2 = args[2] - args[0]
+        v = np.cross(a2, a1, axis=-2)
+    else:
+        raise ValueError('Oriented expects 2 or 3 arguments, got %s.'%len(args))
+    return v / np.linalg.norm(v, axis=-2, keepdims=True)
+
+
+relations_map = {
+        cfg_cls.Equal_to : equal_to,
+        cfg_cls.Mirrored : mirrored,
+        cfg_cls.Centered : centered,
+        cfg_cls.Oriented : oriented,
+        cfg_cls.Cylinder_Geometry  : geometries.cylinder_geometry,
+        cfg_cls.Triangular_Prism   : geometries.triangular_prism,
+        cfg_cls.Sphere_Geometry    : geometries.sphere_geometry,
+        cfg_cls.Composite_Geometry : geometries.composite_geometry}
+
+_batched_geometries = (geometries.cylinder_geometry, 
+                       geometries.triangular_prism,
+                       geometries.sphere_geometry)
+
+def _is_equal(value1, value2):
+    if isinstance(value1, geometries.abstract_geometry):
+        return all(np.array_equal(getattr(value1, attr), getattr(value2, attr))
+                   for attr in 'RPmJ')
+    elif callable(value1):
+        return value1 is value2
+    return np.array_equal(value1, value2)
+
+###############################################################################
+###############################################################################
+
+class configuration_evaluator(object):
+    """
+    A numerical evaluator of a symbolic configuration, that evaluates the
+    values of all the configuration nodes from a given set of user inputs,
+    using numpy implementations of the configuration relations.
+
+    The configuration graph is compiled once into a topologically ordered
+    sequence of numerical evaluations, that is replayed for every evaluated
+    set of inputs.
+
+    Parameters
+    ----------
+    config : abstract_configuration
+        The symbolic configuration instance.
+
+    Attributes
+    ----------
+    input_nodes : list
+        The names of the configuration user inputs.
+    defaults : dict
+        The default values of the user inputs.
+    values : dict
+        The nodes values of the last call of `evaluate` or `update`.
+    """
+
+    def __init__(self, config):
+        try:
+            config = config.config
+        except AttributeError:
+            pass
+        config.evaluate_pending()
+        self.config = config
+        self.values = None
+        self._compile()
+        self._map_arguments()
+
+    def evaluate(self, inputs=None):
+        """
+        Evaluate the configuration nodes values.
+
+        Parameters
+        ----------
+        inputs : dict, optional
+            The values of the user inputs, mapped by the inputs names. The
+            inputs that are not given take their default values.
+
+        Returns
+        -------
+        values : dict
+            The values of all the configuration nodes, mapped by the nodes
+            names, where the geometry nodes are evaluated as geometry
+            instances.
+        """
+        values = self._evaluate_inputs(inputs or {})
+        self.values = self._evaluate(values)
+        return self.values
+
+    def update(self, inputs):
+        """
+        Update the values of some of the user inputs, where only the nodes 
+        that depend on the changed inputs are re-evaluated.
+
+        Parameters
+        ----------
+        inputs : dict
+            The new values of the changed user inputs.
+
+        Returns
+        -------
+        changes : dict
+            The names of the changed nodes under 'nodes', in a topological 
+            order, and the changed topology arguments under 'bodies', 
+            'joints' and 'forces', as dicts that map the names of the 
+            topology elements to the names of their changed arguments.
+        """
+        if self.values is None:
+            self.evaluate()
+        values = self.values
+        new_inputs = self._evaluate_inputs(inputs)
+        changed = [n for n in inputs if not _is_equal(values[n], new_inputs[n])]
+        for node in changed:
+            values[node] = new_inputs[node]
+
+        affected = self.config._get_nodes_descendants(changed)
+        affected = sorted(affected, key=self._order.__getitem__)
+        for node in affected:
+            old_value = values[node]
+            self._evaluate_node(values, *self._evaluations[self._order[node]])
+            if not _is_equal(old_value, values[node]):
+                changed.append(node)
+        return self._report_changes(changed)
+
+    def evaluate_batch(self, inputs):
+        """
+        Evaluate the configuration nodes values for a batch of samples of the
+        user inputs, e.g. hardpoints perturbations of a design of
+        experiments, where all the samples are evaluated at once by the
+        vectorized relations and geometries.
+
+        Parameters
+        ----------
+        inputs : dict
+            The values of the user inputs, mapped by the inputs names, where
+            the batched inputs carry a leading samples axis, i.e. of shape
+            (n_samples, 3) or (n_samples, 3, 1) for vectors and
+            (n_samples,) for scalars. The inputs that are given for a single
+            sample, or not given, are shared by all the samples.
+
+        Returns
+        -------
+        values : dict
+            The values of all the configuration nodes, mapped by the nodes
+            names, where each value has a leading samples axis.
+        """
+        values, n_samples = self._evaluate_batch_inputs(inputs)
+        values = self._evaluate(values)
+        batch = (n_samples,)
+        for node, value in values.items():
+            shape = self._shapes.get(node)
+            if isinstance(value, geometries.abstract_geometry):
+                value.broadcast(batch)
+            elif shape is not None:
+                values[node] = np.broadcast_to(value, batch + shape)
+        return values
+
+    def _evaluate(self, values):
+        for evaluations in self._steps:
+            if len(evaluations) == 1:
+                self._evaluate_node(values, *evaluations[0])
+            else:
+                self._evaluate_geometries(values, evaluations)
+        return values
+
+    @staticmethod
+    def _evaluate_geometries(values, evaluations):
+        geometry_class = evaluations[0][1]
+        arguments = [[values[n] if attr is None else getattr(values[n], attr)
+                      for n, attr in e[2]] for e in evaluations]
+        results = geometries.evaluate_geometries(geometry_class, arguments)
+        for evaluation, geometry in zip(evaluations, results):
+            values[evaluation[0]] = geometry
+
+    @staticmethod
+    def _evaluate_node(values, node, function, arguments):
+        args = [values[n] if attr is None else getattr(values[n], attr)
+                for n, attr in arguments]
+        values[node] = function(*args)
+
+    def _report_changes(self, nodes):
+        changes = {'nodes': nodes, 'bodies': {}, 'joints': {}, 'forces': {}}
+        for node in nodes:
+            if node in self._arguments_map:
+                kind, name = self._arguments_map[node]
+                changes[kind].setdefault(name, []).append(node)
+        return changes
+
+    def _map_arguments(self):
+        """
+        Map the primary nodes to the topology bodies, joints and forces that 
+        own them as arguments.
+        """
+        topology = self.config.topology
+        self._arguments_map = {}
+        for node, data in topology.nodes(data=True):
+            for arg in data.get('arguments_symbols', []):
+                self._arguments_map[str(arg)] = ('bodies', node)
+        for *e, data in topology.edges(data=True):
+            kind = ('forces' if issubclass(data['class'], abstract_force) 
+                    else 'joints')
+            for arg in data.get('arguments_symbols', []):
+                self._arguments_map[str(arg)] = (kind, data['name'])
+
+    def _compile(self):
+        graph = self.config.graph
+        self.input_nodes = []
+        self.defaults = {}
+        self._shapes = {}
+        self._evaluations = []
+        self._order = {}
+        self._steps = []
+        for generation in nx.topological_generations(graph):
+            start = len(self._evaluations)
+            for node in generation:
+                self._compile_node(node)
+            self._group_evaluations(self._evaluations[start:])
+
+    def _compile_node(self, node):
+        graph = self.config.graph
+        nodes = graph.nodes
+        lhs_value = nodes[node]['lhs_value']
+        if isinstance(lhs_value, sm.MatrixSymbol):
+            self._shapes[node] = tuple(lhs_value.shape)
+        elif isinstance(lhs_value, sm.Symbol) \
+            and not isinstance(lhs_value, cfg_cls.Geometry):
+            self._shapes[node] = ()
+        if graph.in_degree(node) == 0:
+            self.input_nodes.append(node)
+            self.defaults[node] = self._get_default_value(lhs_value)
+            return
+        rhs_function = nodes[node]['rhs_function']
+        try:
+            function = relations_map[rhs_function]
+        except KeyError:
+            raise NotImplementedError('No numerical implementation of %r'
+                                      ' for node %r.'%(rhs_function, node))
+        arguments = list(graph.in_edges(node, data='passed_attr'))
+        arguments = [(e[0], e[-1]) for e in arguments]
+        self._order[node] = len(self._evaluations)
+        self._evaluations.append((node, function, arguments))
+
+    def _group_evaluations(self, evaluations):
+        """
+        Group the simple geometries of the same class and number of arguments 
+        within a topological generation, to be evaluated at once.
+        """
+        groups = {}
+        for evaluation in evaluations:
+            node, function, arguments = evaluation
+            if function in _batched_geometries:
+                key = (function, len(arguments))
+                if key not in groups:
+                    groups[key] = []
+                    self._steps.append(groups[key])
+                groups[key].append(evaluation)
+            else:
+                self._steps.append([evaluation])
+
+    def _evaluate_inputs(self, inputs):
+        values = dict(self.defaults)
+        for name, value in inputs.items():
+            if name not in values:
+                raise ValueError('Node %r is not a configuration input.'%name)
+            if self._shapes.get(name):
+                value = np.asarray(value, dtype=np.float64).reshape(self._shapes[name])
+            values[name] = value
+        return values
+
+    def _evaluate_batch_inputs(self, inputs):
+        values = dict(self.defaults)
+        sizes = set()
+        for name, value in inputs.items():
+            if name not in values:
+                raise ValueError('Node %r is not a configuration input.'%name)
+            shape = self._shapes.get(name)
+            if shape is None:
+                values[name] = value
+                continue
+            value = np.asarray(value, dtype=np.float64)
+            if value.size == int(np.prod(shape)):
+                value = value.reshape(shape)
+            else:
+                # a batched input, where vectors may be given as rows.
+                value = value.reshape((len(value),) + shape)
+                sizes.add(len(value))
+            values[name] = value
+        if len(sizes) > 1:
+            raise ValueError('Inconsistent number of samples %s.'%sorted(sizes))
+        n_samples = sizes.pop() if sizes else 1
+        return values, n_samples
+
+    @staticmethod
+    def _get_default_value(node_object):
+        if isinstance(node_object, sm.MatrixSymbol):
+            return np.zeros(node_object.shape, dtype=np.float64)
+        elif isinstance(node_object, sm.Symbol):
+            return 1.0
+        elif isinstance(node_object, type) and issubclass(node_object, sm.Function):
+            return lambda t : 0.0
+
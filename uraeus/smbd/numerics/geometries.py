@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+
+# Local applicataion imports
+from .math_funcs import A, P, triad
+
+###############################################################################
+
+# Default material density of steel in kg/mm^3, consistent with the mm-based
+# units used by the generated models, e.g. gravity as 9810 mm/s^2.
+steel_density = 7.85e-6
+
+###############################################################################
+# Helpers of the column vectors used by the configuration values, of shape
+# (..., 3, 1) and (..., 4, 1), where the leading axes are broadcasted.
+###############################################################################
+
+def _vector(v):
+    v = np.asarray(v, dtype=np.float64)
+    return v[..., 0] if v.shape[-2:] in ((3, 1), (4, 1)) else v
+
+def _column(v):
+    return v[..., None]
+
+###############################################################################
+###############################################################################
+
+class abstract_geometry(object):
+    """
+    **Abstract Class**
+
+    A numerical geometry that evaluates the inertia properties of a rigid
+    body, where the geometry attributes are named after the symbolic geometry
+    attributes, and are used as the values of the bodies arguments.
+
+    Attributes
+    ----------
+    volume : numpy.ndarray
+        The geometry volume, of shape (...).
+    R : numpy.ndarray
+        The location of the center of mass, of shape (..., 3, 1).
+    P : numpy.ndarray
+        The Euler-parameters of the geometry frame, of shape (..., 4, 1).
+    m : numpy.ndarray
+        The mass, of shape (...).
+    J : numpy.ndarray
+        The inertia tensor about the center of mass expressed in the geometry
+        frame, of shape (..., 3, 3).
+    """
+
+    _properties = ('volume', 'R', 'P', 'm', 'J')
+
+    # the number of the leading vector arguments, followed by the scalar
+    # arguments, used to stack the arguments of many geometries.
+    _vectors_count = 0
+
+    def __getitem__(self, index):
+        """
+        The geometry of the given index of the leading axes.
+        """
+        geometry = object.__new__(type(self))
+        for attr in self._properties:
+            setattr(geometry, attr, getattr(self, attr)[index])
+        return geometry
+
+    def _set_properties(self, volume, centroid, frame, mass, inertia):
+        # broadcasting the properties to the common leading axes, as some of
+        # the geometry arguments may be given for a single sample only.
+        batch = np.broadcast_shapes(np.shape(volume), centroid.shape[:-1], 
+                                    frame.shape[:-2], np.shape(mass), 
+                                    inertia.shape[:-2])
+        self.volume = np.broadcast_to(volume, batch)
+        self.R = np.broadcast_to(_column(centroid), batch + (3, 1))
+        self.P = np.broadcast_to(_column(P(frame)), batch + (4, 1))
+        self.m = np.broadcast_to(mass, batch)
+        self.J = np.broadcast_to(inertia, batch + (3, 3))
+    
+    def broadcast(self, batch):
+        """
+        Broadcast the geometry properties to the given leading axes.
+        """
+        self.volume = np.broadcast_to(self.volume, batch)
+        self.R = np.broadcast_to(self.R, batch + (3, 1))
+        self.P = np.broadcast_to(self.P, batch + (4, 1))
+        self.m = np.broadcast_to(self.m, batch)
+        self.J = np.broadcast_to(self.J, batch + (3, 3))
+
+
+class cylinder_geometry(abstract_geometry):
+    """
+    A hollow cylinder between two points, with the geometry frame z-axis
+    along the cylinder axis.
+
+    Parameters
+    ----------
+    arg1, arg2 : numpy.ndarray
+        The centers of the cylinder end faces.
+    ro : float, optional
+        The outer radius. Defaults to 10.
+    ri : float, optional
+        The inner radius. Defaults to 0.
+    density : float, optional
+        The material density. Defaults to `steel_density`.
+    """
+
+    _vectors_count = 2
+
+    def __init__(self, arg1, arg2, ro=10, ri=0, density=steel_density):
+        p1, p2 = _vector(arg1), _vector(arg2)
+        ro = np.asarray(ro, dtype=np.float64)
+        ri = np.asarray(ri, dtype=np.float64)
+        axis = p2 - p1
+        l = np.linalg.norm(axis, axis=-1)
+
+        volume = np.pi * (ro**2 - ri**2) * l
+        mass = density * volume
+        Jzz = mass * (ro**2 + ri**2) / 2
+        Jxx = mass * (3*(ro**2 + ri**2) + l**2) / 12
+        inertia = np.stack([Jxx, Jxx, Jzz], -1)[..., None] * np.eye(3)
+
+        self._set_properties(volume, (p1 + p2)/2, triad(axis), mass, inertia)
+
+
+class triangular_prism(abstract_geometry):
+    """
+    A triangular prism extruded symmetrically normal to the plane of three
+    points, with the geometry frame z-axis normal to the triangle plane and
+    its x-axis along the 1st triangle edge.
+
+    Parameters
+    ----------
+    arg1, arg2, arg3 : numpy.ndarray
+        The triangle vertices.
+    l : float, optional
+        The prism thickness. Defaults to 10.
+    density : float, optional
+        The material density. Defaults to `steel_density`.
+    """
+
+    _vectors_count = 3
+
+    def __init__(self, arg1, arg2, arg3, l=10, density=steel_density):
+        p1, p2, p3 = _vector(arg1), _vector(arg2), _vector(arg3)
+        l = np.asarray(l, dtype=np.float64)
+        normal = np.cross(p2 - p1, p3 - p1)
+        area = 0.5 * np.linalg.norm(normal, axis=-1)
+        frame = triad(normal, p2 - p1)
+        centroid = (p1 + p2 + p3) / 3
+        volume = area * l
+        mass = density * volume
+
+        # the mass normalized second moments about the centroid, of the
+        # triangle and the extrusion thickness, expressed in the prism frame.
+        vertices = np.stack([p1, p2, p3], -2) - centroid[..., None, :]
+        local = vertices @ frame
+        moments = np.einsum('...ki,...kj->...ij', local, local) / 12
+        moments[..., 2, 2] = moments[..., 2, 2] + l**2 / 12
+
+        trace = np.trace(moments, axis1=-2, axis2=-1)
+        inertia = mass[..., None, None] * (trace[..., None, None]*np.eye(3) - moments)
+
+        self._set_properties(volume, centroid, frame, mass, inertia)
+
+
+class sphere_geometry(abstract_geometry):
+    """
+    A solid sphere, with the geometry frame parallel to the global frame.
+
+    Parameters
+    ----------
+    arg1 : numpy.ndarray
+        The sphere center.
+    arg2 : float
+        The sphere radius.
+    density : float, optional
+        The material density. Defaults to `steel_density`.
+    """
+
+    _vectors_count = 1
+
+    def __init__(self, arg1, arg2, density=steel_density):
+        center = _vector(arg1)
+        r = np.asarray(arg2, dtype=np.float64)
+        volume = (4/3) * np.pi * r**3
+        mass = density * volume
+        inertia = (0.4 * mass * r**2)[..., None, None] * np.eye(3)
+        frame = np.broadcast_to(np.eye(3), center.shape[:-1] + (3, 3))
+        self._set_properties(volume, center, frame, mass, inertia)
+
+
+class composite_geometry(abstract_geometry):
+    """
+    A composite of other geometries, with the geometry frame parallel to the
+    global frame, where the inertia tensors of the geometries are combined
+    about the composite center of mass.
+
+    Parameters
+    ----------
+    *geometries : abstract_geometry
+        The composed geometries.
+    """
+
+    def __init__(self, *geometries):
+        self.geometries = geometries
+        masses = [np.asarray(g.m, dtype=np.float64) for g in geometries]
+        mass = sum(masses)
+        volume = sum(np.asarray(g.volume, dtype=np.float64) for g in geometries)
+        centroid = sum(m[..., None] * _vector(g.R)
+                       for m, g in zip(masses, geometries)) / mass[..., None]
+
+        inertia = 0
+        for m, g in zip(masses, geometries):
+            Ai = A(_vector(g.P))
+            d  = _vector(g.R) - centroid
+            shift = (np.sum(d*d, -1)[..., None, None]*np.eye(3)
+                     - d[..., :, None]*d[..., None, :])
+            inertia = inertia + Ai @ g.J @ np.swapaxes(Ai, -1, -2) \
+                      + m[..., None, None] * shift
+
+        frame = np.broadcast_to(np.eye(3), centroid.shape[:-1] + (3, 3))
+        self._set_properties(volume, centroid, frame, mass, inertia)
+
+###############################################################################
+###############################################################################
+
+def evaluate_geometries(geometry_class, arguments):
+    """
+    Evaluate the mass properties of many geometries of the same class in a
+    single vectorized evaluation.
+
+    Parameters
+    ----------
+    geometry_class : type
+        A sub-class of the `abstract_geometry`.
+    arguments : list (of tuples)
+        The arguments of each geometry, where all the geometries should have 
+        the same number of arguments, that may carry broadcastable leading
+        axes, e.g. a configuration samples axis.
+
+    Returns
+    -------
+    geometries : list
+        The evaluated geometries instances, ordered as the given arguments.
+
+    Notes
+    -----
+    All the arguments are broadcasted to their common leading axes first,
+    then stacked along a geometries axis placed after the leading axes, so
+    that the geometries axis never collides with the samples axes.
+    """
+    nvectors = geometry_class._vectors_count
+    arguments = [[_vector(a) if i < nvectors else np.asarray(a, dtype=np.float64)
+                  for i, a in enumerate(args)] for args in arguments]
+    batch = np.broadcast_shapes(*[a.shape[:-1] if i < nvectors else a.shape
+                                  for args in arguments
+                                  for i, a in enumerate(args)])
+    axis = len(batch)
+    stacked = []
+    for i, args in enumerate(zip(*arguments)):
+        core = ((3,) if i < nvectors else ())
+        stacked.append(np.stack([np.broadcast_to(a, batch + core) for a in args],
+                                axis))
+    geometries = geometry_class(*stacked)
+    leading = (slice(None),) * axis
+    return [geometries[leading + (i,)] for i in range(len(arguments))]
+
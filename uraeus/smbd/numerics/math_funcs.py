@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+
+###############################################################################
+# Vectorized implementations of the spatial kinematics matrix functions, where
+# all the functions broadcast over the leading axes of their arguments, e.g.
+# a trajectory of Euler-parameters of shape (n_steps, 4) results in a
+# trajectory of transformation matrices of shape (n_steps, 3, 3).
+###############################################################################
+
+def skew(v):
+    """
+    The skew-symmetric matrix of a vector of shape (..., 3).
+    """
+    v = np.asarray(v, dtype=np.float64)
+    x, y, z = v[..., 0], v[..., 1], v[..., 2]
+    zero = np.zeros_like(x)
+    return np.stack([np.stack([zero,   -z,    y], -1),
+                     np.stack([   z, zero,   -x], -1),
+                     np.stack([  -y,    x, zero], -1)], -2)
+
+def G(P):
+    """
+    The G matrix of the Euler-parameters of shape (..., 4).
+    """
+    P = np.asarray(P, dtype=np.float64)
+    e0, e = P[..., 0:1], P[..., 1:4]
+    I = np.eye(3)
+    return np.concatenate([-e[..., None], -skew(e) + e0[..., None] * I], -1)
+
+def E(P):
+    """
+    The E matrix of the Euler-parameters of shape (..., 4).
+    """
+    P = np.asarray(P, dtype=np.float64)
+    e0, e = P[..., 0:1], P[..., 1:4]
+    I = np.eye(3)
+    return np.concatenate([-e[..., None], skew(e) + e0[..., None] * I], -1)
+
+def A(P):
+    """
+    The transformation matrix of the Euler-parameters of shape (..., 4).
+    """
+    return E(P) @ np.swapaxes(G(P), -1, -2)
+
+def B(P, u):
+    """
+    The B matrix of the Euler-parameters of shape (..., 4) and a body-local
+    vector of shape (..., 3), where B(P, u) * Pd is the time derivative of
+    A(P) * u.
+    """
+    P = np.asarray(P, dtype=np.float64)
+    u = np.asarray(u, dtype=np.float64)
+    e0, e = P[..., 0:1], P[..., 1:4]
+    I = np.eye(3)
+    m = e0[..., None] * I + skew(e)
+    col = (m @ u[..., None])
+    e, u = np.broadcast_arrays(e, u)
+    mat = e[..., :, None] * u[..., None, :] - m @ skew(u)
+    return 2 * np.concatenate([col, mat], -1)
+
+def P(A):
+    """
+    The Euler-parameters of shape (..., 4) of a transformation matrix of 
+    shape (..., 3, 3), where the scalar part is kept non-negative.
+    """
+    A = np.asarray(A, dtype=np.float64)
+    trace = np.trace(A, axis1=-2, axis2=-1)
+    diagonal = np.stack([trace, A[..., 0, 0], A[..., 1, 1], A[..., 2, 2]], -1)
+    
+    # the four candidate solutions, each is numerically robust when its 
+    # pivot component is the largest one.
+    s0 = 0.5 * np.sqrt(np.maximum(1 + trace, 1e-300))
+    s1 = 0.5 * np.sqrt(np.maximum(1 + 2*A[..., 0, 0] - trace, 1e-300))
+    s2 = 0.5 * np.sqrt(np.maximum(1 + 2*A[..., 1, 1] - trace, 1e-300))
+    s3 = 0.5 * np.sqrt(np.maximum(1 + 2*A[..., 2, 2] - trace, 1e-300))
+    
+    a32 = A[..., 2, 1] - A[..., 1, 2]
+    a13 = A[..., 0, 2] - A[..., 2, 0]
+    a21 = A[..., 1, 0] - A[..., 0, 1]
+    b21 = A[..., 1, 0] + A[..., 0, 1]
+    b13 = A[..., 0, 2] + A[..., 2, 0]
+    b32 = A[..., 2, 1] + A[..., 1, 2]
+    
+    with np.errstate(over='ignore', invalid='ignore'):
+        candidates = np.stack([
+            np.stack([s0, a32/(4*s0), a13/(4*s0), a21/(4*s0)], -1),
+            np.stack([a32/(4*s1), s1, b21/(4*s1), b13/(4*s1)], -1),
+            np.stack([a13/(4*s2), b21/(4*s2), s2, b32/(4*s2)], -1),
+            np.stack([a21/(4*s3), b13/(4*s3), b32/(4*s3), s3], -1)], -2)
+    
+    pivot = np.argmax(diagonal, -1)[..., None, None]
+    p = np.take_along_axis(candidates, pivot, -2)[..., 0, :]
+    p = np.where(p[..., 0:1] < 0, -p, p)
+    return p / np.linalg.norm(p, axis=-1, keepdims=True)
+
+def triad(v1, v2=None):
+    """
+    An orthonormal frame of shape (..., 3, 3) whose z-axis is along the 
+    vector v1 of shape (..., 3). The x-axis is along the component of the 
+    vector v2 that is normal to v1 if given, otherwise it is along the 
+    component of the global x-axis, or the global y-axis if v1 is nearly 
+    parallel to the x-axis.
+    """
+    v1 = np.asarray(v1, dtype=np.float64)
+    k = v1 / np.linalg.norm(v1, axis=-1, keepdims=True)
+    if v2 is None:
+        x_axis = np.array([1., 0., 0.])
+        y_axis = np.array([0., 1., 0.])
+        parallel = np.abs(k[..., 0:1]) > 0.9
+        v2 = np.where(parallel, y_axis, x_axis)
+    v2 = np.asarray(v2, dtype=np.float64)
+    i = v2 - np.sum(v2 * k, -1, keepdims=True) * k
+    i = i / np.linalg.norm(i, axis=-1, keepdims=True)
+    j = np.cross(k, i)
+    return np.stack([i, j, k], -1)
+
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import scipy.sparse as sparse
+
+###############################################################################
+###############################################################################
+
+def coordinates_offsets(cols):
+    """
+    Evaluate the scalar column offsets and sizes of the given column blocks
+    indices, where each body occupies two column blocks of sizes 3 and 4 for
+    its position and orientation coordinates respectively.
+    """
+    cols = np.asarray(cols)
+    sizes = np.where(cols % 2 == 0, 3, 4)
+    offsets = (cols // 2) * 7 + np.where(cols % 2 == 0, 0, 3)
+    return offsets, sizes
+
+
+def csc_pattern(rows, cols, shape):
+    """
+    Construct a zero-valued CSC matrix of the given scalar sparsity pattern.
+
+    Parameters
+    ----------
+    rows : numpy.ndarray
+        The rows indices of the non-zero entries.
+    cols : numpy.ndarray
+        The columns indices of the non-zero entries.
+    shape : tuple
+
+    Returns
+    -------
+    order : numpy.ndarray
+        The permutation that orders data given in the order of the `rows`
+        and `cols` entries into the CSC data order.
+    matrix : scipy.sparse.csc_matrix
+    """
+    order = np.lexsort((rows, cols))
+    indices = rows[order]
+    indptr = np.zeros(shape[1] + 1, dtype=np.int64)
+    np.add.at(indptr, cols + 1, 1)
+    np.cumsum(indptr, out=indptr)
+    data = np.zeros(len(rows))
+    matrix = sparse.csc_matrix((data, indices, indptr), shape=shape)
+    return order, matrix
+
+
+class block_sparse_assembler(object):
+    """
+    A helper class that assembles a sequence of dense numerical blocks into a
+    scipy sparse matrix of a fixed sparsity pattern, as evaluated by the
+    generated numerical topology classes, e.g. the `jac_eq_blocks` located
+    at the `jac_rows` and `jac_cols` indices.
+
+    The scalar sparsity pattern is evaluated once on instantiation, so that
+    the assemblage of new blocks values only copies the data into a
+    preallocated CSC matrix.
+
+    Parameters
+    ----------
+    rows : array_like
+        The row-block index of each block.
+    cols : array_like
+        The column-block index of each block, where each body occupies two
+        column blocks of sizes 3 and 4.
+    blocks : sequence of array_like
+        A sample of the blocks values used to determine the blocks' shapes.
+    shape : tuple, optional
+        The scalar shape of the assembled matrix. Evaluated from the blocks
+        if not given.
+
+    Attributes
+    ----------
+    rows_offsets : numpy.ndarray
+        The scalar offset of each row-block.
+    matrix : scipy.sparse.csc_matrix
+        The last assembled matrix.
+    """
+
+    def __init__(self, rows, cols, blocks, shape=None):
+        rows = np.asarray(rows)
+        blocks = [np.atleast_2d(np.asarray(b, dtype=np.float64)) for b in blocks]
+
+        heights = {}
+        for r, b in zip(rows, blocks):
+            heights.setdefault(r, b.shape[0])
+        nrow_blocks = max(heights) + 1
+        rows_sizes = np.array([heights.get(r, 0) for r in range(nrow_blocks)])
+        self.rows_offsets = np.concatenate([[0], np.cumsum(rows_sizes)[:-1]])
+        self.rows_sizes = rows_sizes
+
+        cols_offsets, _ = coordinates_offsets(cols)
+
+        rows_ind = []
+        cols_ind = []
+        for r, c, b in zip(rows, cols_offsets, blocks):
+            m, n = b.shape
+            r0 = self.rows_offsets[r]
+            rows_ind.append(np.repeat(np.arange(r0, r0 + m), n))
+            cols_ind.append(np.tile(np.arange(c, c + n), m))
+        rows_ind = np.concatenate(rows_ind)
+        cols_ind = np.concatenate(cols_ind)
+
+        if shape is None:
+            shape = (int(rows_sizes.sum()), int(cols_ind.max()) + 1)
+        self.shape = shape
+        self.nnz = len(rows_ind)
+
+        self._order, self.matrix = csc_pattern(rows_ind, cols_ind, shape)
+        self.rows_indices = rows_ind
+        self.cols_indices = cols_ind
+
+    def assemble(self, blocks):
+        """
+        Assemble the given blocks values into the preallocated sparse matrix.
+
+        Parameters
+        ----------
+        blocks : sequence of array_like
+            The blocks values in the same order and shapes of the blocks used
+            on instantiation.
+
+        Returns
+        -------
+        matrix : scipy.sparse.csc_matrix
+        """
+        data = np.concatenate([np.asarray(b, dtype=np.float64).ravel() for b in blocks])
+        self.matrix.data[:] = data[self._order]
+        return self.matrix
+
+    def scalar_rows(self, row_block):
+        """
+        Return the scalar rows indices of a given row-block.
+        """
+        start = self.rows_offsets[row_block]
+        return np.arange(start, start + self.rows_sizes[row_block])
+
+
+class augmented_assembler(object):
+    """
+    A helper class that assembles the augmented matrix of the equations of
+    motion and the constraints jacobian
+
+        [[M, J.T],
+         [J,  0 ]]
+
+    into a preallocated scipy sparse matrix, given the mass matrix and the
+    jacobian assembled by two instances of the `block_sparse_assembler`.
+
+    Parameters
+    ----------
+    mass : scipy.sparse.csc_matrix
+        The mass matrix of the preallocated mass matrix assembler.
+    jac : scipy.sparse.csc_matrix
+        The jacobian of the preallocated jacobian assembler.
+
+    Attributes
+    ----------
+    matrix : scipy.sparse.csc_matrix
+        The last assembled matrix.
+    """
+
+    def __init__(self, mass, jac):
+        n  = mass.shape[0]
+        nc = jac.shape[0]
+        mass = mass.tocoo()
+        jac  = jac.tocoo()
+        rows = np.concatenate([mass.row, jac.row + n, jac.col])
+        cols = np.concatenate([mass.col, jac.col, jac.row + n])
+        self.shape = (n + nc, n + nc)
+        self._order, self.matrix = csc_pattern(rows, cols, self.shape)
+
+    def assemble(self, mass, jac, mass_scale=1.0):
+        """
+        Assemble the given mass matrix and jacobian into the preallocated
+        augmented matrix.
+
+        Parameters
+        ----------
+        mass : scipy.sparse.csc_matrix
+            The mass matrix, with the same sparsity pattern used on
+            instantiation.
+        jac : scipy.sparse.csc_matrix
+            The jacobian, with the same sparsity pattern used on
+            instantiation.
+        mass_scale : float, optional
+            A scaling factor of the mass matrix block.
+
+        Returns
+        -------
+        matrix : scipy.sparse.csc_matrix
+        """
+        data = np.concatenate([mass_scale * mass.data, jac.data, jac.data])
+        self.matrix.data[:] = data[self._order]
+        return self.matrix
+
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+
+# Local applicataion imports
+from .math_funcs import A, B, E, skew
+from .results import lagrange_indicies
+from ..symbolic.components.algebraic_constraints import joint_actuator
+from ..symbolic.components import constraints_equations as equations
+
+###############################################################################
+
+# Columns indices of the joint markers base vectors.
+_axes = {'i': 0, 'j': 1, 'k': 2}
+
+###############################################################################
+# Batched jacobians of the primitive constraints w.r.t. the coordinates of the
+# 1st body, mirroring the `construct` methods of the primitive constraints
+# classes. Each function returns an array of shape (n_steps, nc, 7).
+###############################################################################
+
+def _spherical_jacobian(primitive, s):
+    J_R = np.broadcast_to(np.eye(3), (s.nsteps, 3, 3))
+    J_P = B(s.Pi, s.ui_bar)
+    return np.concatenate([J_R, J_P], -1)
+
+def _dot_product_1_jacobian(primitive, s):
+    v1_bar = s.Mi_bar[:, _axes[primitive.v1]]
+    v2 = s.Aj @ s.Mj_bar[:, _axes[primitive.v2]]
+    J_P = np.einsum('ni,nij->nj', v2, B(s.Pi, v1_bar))
+    return s.stack(np.zeros((s.nsteps, 3)), J_P)
+
+def _dot_product_2_jacobian(primitive, s):
+    v_bar = s.Mi_bar[:, _axes[primitive.v]]
+    v = s.Ai @ v_bar
+    J_P = (np.einsum('ni,nij->nj', s.dij, B(s.Pi, v_bar))
+           + np.einsum('ni,nij->nj', v, B(s.Pi, s.ui_bar)))
+    return s.stack(v, J_P)
+
+def _angle_jacobian(primitive, s):
+    v1_bar = s.Mi_bar[:, 0]
+    v3_bar = s.Mi_bar[:, 1]
+    v2 = s.Aj @ s.Mj_bar[:, 0]
+    c = np.cos(s.theta)[:, None, None]
+    sn = np.sin(s.theta)[:, None, None]
+    matrix = c * B(s.Pi, v3_bar) - sn * B(s.Pi, v1_bar)
+    J_P = np.einsum('ni,nij->nj', v2, matrix)
+    return s.stack(np.zeros((s.nsteps, 3)), J_P)
+
+def _distance_jacobian(primitive, s):
+    J_R = 2 * s.dij
+    J_P = 2 * np.einsum('ni,nij->nj', s.dij, B(s.Pi, s.ui_bar))
+    return s.stack(J_R, J_P)
+
+def _coordinate_jacobian(primitive, s):
+    i = s.joint.i
+    J_R = np.zeros((s.nsteps, 3))
+    J_R[:, i] = 1
+    J_P = B(s.Pi, s.ui_bar)[:, i, :]
+    return s.stack(J_R, J_P)
+
+
+primitives_jacobians = {
+        equations.spehrical_constraint   : _spherical_jacobian,
+        equations.dot_product_1          : _dot_product_1_jacobian,
+        equations.dot_product_2          : _dot_product_2_jacobian,
+        equations.angle_constraint       : _angle_jacobian,
+        equations.distance_constraint    : _distance_jacobian,
+        equations.coordinate_constraint  : _coordinate_jacobian,
+        equations.coordinate_constraint1 : _coordinate_jacobian}
+
+###############################################################################
+###############################################################################
+
+class _joint_state(object):
+    """
+    The batched state of a joint and its bodies over a trajectory.
+    """
+
+    def __init__(self, joint, constants, Ri, Pi, Rj, Pj, theta):
+        self.joint = joint
+        self.nsteps = len(Pi)
+        self.Pi, self.Pj = Pi, Pj
+        self.Ai, self.Aj = A(Pi), A(Pj)
+        self.Mi_bar, self.Mj_bar, self.ui_bar, self.uj_bar = constants
+        self.theta = theta
+        if self.ui_bar is not None and self.uj_bar is not None:
+            self.dij = (Ri + self.Ai @ self.ui_bar) - (Rj + self.Aj @ self.uj_bar)
+
+    @staticmethod
+    def stack(J_R, J_P):
+        return np.concatenate([J_R, J_P], -1)[:, None, :]
+
+
+class reactions_evaluator(object):
+    """
+    A post-processing evaluator of the joints reactions over whole
+    trajectories, where the reactions of all the time steps are evaluated
+    in batched numpy operations, instead of the per-step
+    `eval_reactions_eq` method of the generated numerical topology classes.
+
+    The reactions are evaluated as defined by the
+    `abstract_joint._create_reactions_equalities`, i.e.
+
+        Qi = -Ji.T * L
+        Fi = Qi[0:3]
+        Ti = 0.5 * E(Pi) * Qi[3:7] - skew(A(Pi) * ui_bar) * Fi
+
+    where `Ji` is the jacobian of the joint constraints w.r.t. the 1st body
+    coordinates, batched from the joint primitive constraints.
+
+    Parameters
+    ----------
+    topology : abstract_topology
+        The assembled symbolic topology.
+    model : object
+        An initialized instance of the numerical topology class generated
+        from the given symbolic topology, used for the numerical values of
+        the joints constants and actuation functions.
+
+    Attributes
+    ----------
+    reactions_names : list
+        The names of the evaluated reactions, ordered as the model
+        `reactions_indicies`.
+    """
+
+    def __init__(self, topology, model):
+        try:
+            topology = topology.topology
+        except AttributeError:
+            pass
+        self.topology = topology
+        self.model = model
+        self._lagrange_indicies = lagrange_indicies(model)
+        self._construct_joints_data()
+
+    def evaluate(self, time, pos, lagrange):
+        """
+        Evaluate the joints reactions over a given trajectory.
+
+        Parameters
+        ----------
+        time : array_like
+            The time values of shape (n_steps,).
+        pos : array_like
+            The generalized coordinates of shape (n_steps, n).
+        lagrange : array_like
+            The lagrange multipliers of shape (n_steps, nc).
+
+        Returns
+        -------
+        reactions : dict
+            A dict that maps the reactions names to their values of shape
+            (n_steps, 3).
+        """
+        time = np.asarray(time, dtype=np.float64)
+        pos = np.asarray(pos, dtype=np.float64)
+        lagrange = np.asarray(lagrange, dtype=np.float64)
+        pos = pos.reshape(pos.shape[:2])
+        lagrange = lagrange.reshape(lagrange.shape[:2])
+
+        reactions = {}
+        for data in self._joints:
+            F, T = self._evaluate_joint(data, time, pos, lagrange)
+            reactions[data['F']] = F
+            reactions[data['T']] = T
+        return reactions
+
+    def _construct_joints_data(self):
+        model = self.model
+        prefix = getattr(model, 'prefix', '')
+        self._joints = []
+        self.reactions_names = []
+        edges = self.topology.constraints_graph.edges
+        for e in edges:
+            if 'obj' not in edges[e] or edges[e].get('virtual', False):
+                continue
+            joint = edges[e]['obj']
+            body_i = joint.body_i.id_name
+            body_j = joint.body_j.id_name
+            start, stop = self._lagrange_indicies[joint.id_name]
+
+            # the numerical constants are named by the generated model without
+            # the symbolic prefix of the joint.
+            names = (joint.mi_bar.name, joint.mj_bar.name,
+                     joint.ui_bar.raw_name, joint.uj_bar.raw_name)
+            Mi_bar, Mj_bar, ui_bar, uj_bar = [self._get_constant(n, joint.prefix)
+                                              for n in names]
+            if ui_bar is not None and uj_bar is not None:
+                ui_bar, uj_bar = ui_bar[:, 0], uj_bar[:, 0]
+
+            act_func = None
+            if hasattr(joint, 'act_func'):
+                act_func = 'UF_%s'%joint.id_name
+
+            local_torque = (joint.def_locs == 0 or isinstance(joint, joint_actuator))
+            data = {'joint': joint,
+                    'i': getattr(model, body_i),
+                    'j': getattr(model, body_j),
+                    'lagrange': slice(start, stop),
+                    'constants': (Mi_bar, Mj_bar, ui_bar, uj_bar),
+                    'act_func': act_func,
+                    'local_torque': local_torque,
+                    'F': '%sF_%s_%s'%(prefix, body_i, joint.id_name),
+                    'T': '%sT_%s_%s'%(prefix, body_i, joint.id_name)}
+            self._joints.append(data)
+
+        order = {name: i for i, name in enumerate(model.reactions_indicies)}
+        self._joints.sort(key=lambda d: order.get(d['F'], len(order)))
+        for data in self._joints:
+            self.reactions_names += [data['F'], data['T']]
+
+    def _get_constant(self, name, prefix):
+        if prefix and name.startswith(prefix):
+            name = name[len(prefix):]
+        value = getattr(self.model, name, None)
+        if value is None:
+            return None
+        return np.asarray(value, dtype=np.float64)
+
+    def _evaluate_joint(self, data, time, pos, lagrange):
+        i, j = data['i'], data['j']
+        Ri, Pi = pos[:, 7*i:7*i+3], pos[:, 7*i+3:7*i+7]
+        Rj, Pj = pos[:, 7*j:7*j+3], pos[:, 7*j+3:7*j+7]
+
+        theta = None
+        if data['act_func'] is not None:
+            theta = self._evaluate_function(data['act_func'], time)
+
+        joint = data['joint']
+        state = _joint_state(joint, data['constants'], Ri, Pi, Rj, Pj, theta)
+        jacobian = np.concatenate([primitives_jacobians[type(p)](p, state)
+                                   for p in joint.vector_equations], 1)
+
+        L = lagrange[:, data['lagrange']]
+        Qi = -np.einsum('nki,nk->ni', jacobian, L)
+        F  = Qi[:, 0:3]
+        T  = 0.5 * np.einsum('nij,nj->ni', E(Pi), Qi[:, 3:7])
+        if not data['local_torque']:
+            ui = state.Ai @ state.ui_bar
+            T -= np.einsum('nij,nj->ni', skew(ui), F)
+        return F, T
+
+    def _evaluate_function(self, name, time):
+        """
+        Evaluate an actuation function of the model configuration over the
+        given time values, falling back to a per-step evaluation for
+        functions that are not vectorized.
+        """
+        function = getattr(self.model.config, name)
+        try:
+            values = np.asarray(function(time), dtype=np.float64)
+        except Exception:
+            values = None
+        if values is None or values.shape != time.shape:
+            values = np.array([function(t) for t in time], dtype=np.float64)
+        return values.reshape(time.shape)
+
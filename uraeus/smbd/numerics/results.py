@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# Standard library imports
+import os
+import copy
+import json
+
+# 3rd party library imports
+import numpy as np
+
+###############################################################################
+###############################################################################
+
+def lagrange_indicies(model):
+    """
+    Evaluate the slices of the lagrange multipliers of each joint in a given
+    numerical model, by probing the `set_lagrange_multipliers` method of a
+    shallow copy of the model, leaving the model state unchanged.
+
+    Parameters
+    ----------
+    model : object
+        An instance of a generated numerical topology class.
+
+    Returns
+    -------
+    indicies : dict
+        A dict that maps the joints names to their [start, stop] indices in
+        the lagrange multipliers vector.
+    """
+    probe = np.arange(model.nc, dtype=np.float64).reshape(-1, 1)
+    model = copy.copy(model)
+    model.set_lagrange_multipliers(probe)
+    indicies = {}
+    for attr, value in vars(model).items():
+        if attr.startswith('L_') and isinstance(value, np.ndarray):
+            start = int(value[0, 0])
+            indicies[attr[2:]] = [start, start + value.shape[0]]
+    return dict(sorted(indicies.items(), key=lambda item: item[1]))
+
+
+class results_writer(object):
+    """
+    A writer of the simulation time series of a numerical model into
+    memory-mapped `.npy` files, indexed by a small JSON file.
+
+    Each time series is stored in a preallocated `.npy` file that is grown
+    by doubling its capacity if needed. The appended time steps are buffered
+    and written to the files in chunks.
+
+    Parameters
+    ----------
+    directory : str
+        The path of the results directory, created if it does not exist.
+    model : object
+        An instance of a generated numerical topology class.
+    capacity : int, optional
+        The number of preallocated time steps. Defaults to 1024.
+    chunk_size : int, optional
+        The number of buffered time steps written at once. Defaults to 64.
+
+    Notes
+    -----
+    The stored series are 'time', 'pos', 'vel', 'acc', 'lagrange' and
+    'reactions', where a series is only stored if it was given to the first
+    appended time step, and all the following time steps should be given the
+    same series.
+    """
+
+    def __init__(self, directory, model, capacity=1024, chunk_size=64):
+        self.directory = directory
+        self.capacity = capacity
+        self.chunk_size = chunk_size
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+        prefix = getattr(model, 'prefix', '')
+        self._reactions_keys = [name[len(prefix):]
+                                for name in model.reactions_indicies]
+        self.index = {'n' : model.n,
+                      'nc': model.nc,
+                      'count': 0,
+                      'bodies': {name: [7*i, 7*i + 7]
+                                 for name, i in model.indicies_map.items()},
+                      'joints': lagrange_indicies(model),
+                      'reactions': {name: i for i, name
+                                    in enumerate(model.reactions_indicies)},
+                      'series': {}}
+
+        self._shapes = {'time': (), 'pos': (model.n,), 'vel': (model.n,),
+                        'acc': (model.n,), 'lagrange': (model.nc,),
+                        'reactions': (len(self._reactions_keys), 3)}
+        self._arrays = {}
+        self._buffer = []
+
+    def append(self, t, q, qd=None, qdd=None, Lambda=None, reactions=None):
+        """
+        Append a time step to the stored time series.
+
+        Parameters
+        ----------
+        t : float
+            The time value.
+        q : numpy.ndarray
+            The generalized coordinates.
+        qd, qdd : numpy.ndarray, optional
+            The generalized velocities and accelerations.
+        Lambda : numpy.ndarray, optional
+            The lagrange multipliers.
+        reactions : dict, optional
+            The reactions dict evaluated by the model `eval_reactions_eq`.
+
+        Raises
+        ------
+        ValueError
+            If the given series differ from the series of the first appended
+            time step.
+        """
+        step = {'time': t, 'pos': q, 'vel': qd, 'acc': qdd, 'lagrange': Lambda}
+        if reactions is not None:
+            step['reactions'] = np.hstack([reactions[k] for k in
+                                           self._reactions_keys]).T
+        step = {k: v for k, v in step.items() if v is not None}
+
+        if not self._arrays:
+            for name in step:
+                self._open(name, self.capacity)
+        elif step.keys() != self._arrays.keys():
+            missing = [k for k in self._arrays if k not in step]
+            unexpected = [k for k in step if k not in self._arrays]
+            raise ValueError('Time step %s series do not match the stored '
+                             'series! missing = %s, unexpected = %s.'
+                             %(self.count + len(self._buffer), missing,
+                               unexpected))
+        self._buffer.append(step)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def append_solver(self, solver):
+        """
+        Append the time steps stored in the histories of a given solver.
+        """
+        lagrange = getattr(solver, 'lagrange_multipliers', {})
+        for i in sorted(solver.pos_history):
+            self.append(solver.time_array[i], solver.pos_history[i],
+                        solver.vel_history[i], solver.acc_history[i],
+                        lagrange.get(i))
+
+    def flush(self):
+        """
+        Write the buffered time steps to the memory-mapped files and update
+        the JSON index.
+        """
+        nsteps = len(self._buffer)
+        if nsteps:
+            start, stop = self.count, self.count + nsteps
+            if stop > self.capacity:
+                self._grow(max(2*self.capacity, stop))
+            for name, array in self._arrays.items():
+                chunk = [np.asarray(step[name], dtype=np.float64) for step in self._buffer]
+                array[start:stop] = np.reshape(chunk, (nsteps,) + self._shapes[name])
+                array.flush()
+            self.count = stop
+            self._buffer = []
+        self.index['count'] = self.count
+        self._write_index()
+
+    def close(self):
+        self.flush()
+        self._arrays = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _path(self, name):
+        return os.path.join(self.directory, '%s.npy'%name)
+
+    def _open(self, name, capacity):
+        shape = (capacity,) + self._shapes[name]
+        self._arrays[name] = np.lib.format.open_memmap(self._path(name), 'w+',
+                                                       np.float64, shape)
+        self.index['series'][name] = '%s.npy'%name
+
+    def _grow(self, capacity):
+        # the series are copied in chunks to larger files under temporary
+        # names, which then replace the original files, so that the stored
+        # time steps are not lost if the growth is interrupted.
+        for name in list(self._arrays):
+            array = self._arrays.pop(name)
+            path = self._path(name)
+            shape = (capacity,) + self._shapes[name]
+            grown = np.lib.format.open_memmap(path + '.tmp', 'w+', np.float64,
+                                              shape)
+            for start in range(0, self.count, self.chunk_size):
+                stop = min(start + self.chunk_size, self.count)
+                grown[start:stop] = array[start:stop]
+            grown.flush()
+            del array, grown
+            os.replace(path + '.tmp', path)
+            self._arrays[name] = np.lib.format.open_memmap(path, 'r+')
+        self.capacity = capacity
+
+    def _write_index(self):
+        self.index['capacity'] = self.capacity
+        path = os.path.join(self.directory, 'index.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.index, f, indent=4)
+        os.replace(path + '.tmp', path)
+
+###############################################################################
+###############################################################################
+
+class results_reader(object):
+    """
+    A reader of the simulation time series stored by the `results_writer`,
+    where the series are memory-mapped and sliced without copying.
+
+    Parameters
+    ----------
+    directory : str
+        The path of the results directory.
+
+    Examples
+    --------
+    >>> results = results_reader('results')
+    >>> results.body('rbs_l1', 'vel')     # (count, 7) view
+    >>> results.reaction('F_ground_jcs_a') # (count, 3) view
+    >>> results['jcs_a']                   # the joint lagrange multipliers
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'index.json')) as f:
+            self.index = json.load(f)
+        self.count = self.index['count']
+        self.series = {}
+        for name, file_name in self.index['series'].items():
+            array = np.load(os.path.join(directory, file_name), mmap_mode='r')
+            self.series[name] = array[:self.count]
+
+    @property
+    def time(self):
+        return self.series['time']
+
+    @property
+    def bodies(self):
+        return list(self.index['bodies'])
+
+    @property
+    def joints(self):
+        return list(self.index['joints'])
+
+    @property
+    def reactions(self):
+        return list(self.index['reactions'])
+
+    def body(self, name, series='pos'):
+        """
+        Return the time series of the coordinates of a given body.
+
+        Parameters
+        ----------
+        name : str
+            The body name as in the model `indicies_map`.
+        series : str, {'pos', 'vel', 'acc'}
+
+        Returns
+        -------
+        values : numpy.memmap
+            A (count, 7) view of the body R and P coordinates.
+        """
+        start, stop = self.index['bodies'][name]
+        return self.series[series][:, start:stop]
+
+    def joint(self, name):
+        """
+        Return the time series of the lagrange multipliers of a given joint.
+        """
+        start, stop = self.index['joints'][name]
+        return self.series['lagrange'][:, start:stop]
+
+    def reaction(self, name):
+        """
+        Return the time series of a given reaction force or torque, as named
+        in the model `reactions_indicies`.
+        """
+        return self.series['reactions'][:, self.index['reactions'][name]]
+
+    def __getitem__(self, name):
+        if name in self.index['bodies']:
+            return self.body(name)
+        elif name in self.index['joints']:
+            return self.joint(name)
+        elif name in self.index['reactions']:
+            return self.reaction(name)
+        elif name in self.series:
+            return self.series[name]
+        raise KeyError(name)
+
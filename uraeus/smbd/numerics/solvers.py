@@ -0,0 +1,891 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# Standard library imports
+import time
+
+# 3rd party library imports
+import numpy as np
+import scipy.linalg
+import scipy.integrate
+import scipy.sparse.linalg as splinalg
+
+# Local applicataion imports
+from .matrix_assembly import block_sparse_assembler, augmented_assembler
+
+###############################################################################
+###############################################################################
+
+class _convergence_error(RuntimeError):
+    pass
+
+class abstract_solver(object):
+    """
+    A base class of the numerical solvers that drive the numerical topology
+    classes generated from the symbolic topologies.
+
+    Parameters
+    ----------
+    model : object
+        An instance of a generated numerical topology class, with its `config`
+        set. The model is initialized if it has not been initialized yet.
+
+    Attributes
+    ----------
+    n : int
+        The number of the generalized coordinates.
+    nc : int
+        The number of the scalar constraints equations.
+    pos_history : dict
+        The converged generalized coordinates at each time step.
+    vel_history : dict
+        The generalized velocities at each time step.
+    acc_history : dict
+        The generalized accelerations at each time step.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        if not hasattr(model, 'jac_rows'):
+            model.initialize()
+
+        self.n  = model.n
+        self.nc = model.nc
+
+        self._pos = np.array(model.q0, dtype=np.float64)
+        self._vel = np.array(model.qd0, dtype=np.float64)
+        self._acc = np.zeros_like(self._pos)
+        self._set_time(0)
+
+        self._jac_assembler  = None
+        self._mass_assembler = None
+
+        self.pos_history = {}
+        self.vel_history = {}
+        self.acc_history = {}
+
+    def _set_time(self, t):
+        self.model.t = t
+
+    def _set_gen_coordinates(self, q):
+        self.model.set_gen_coordinates(q)
+
+    def _set_gen_velocities(self, qd):
+        self.model.set_gen_velocities(qd)
+
+    def _set_gen_accelerations(self, qdd):
+        self.model.set_gen_accelerations(qdd)
+
+    def _eval_pos_eq(self):
+        self.model.eval_pos_eq()
+        return np.concatenate(self.model.pos_eq_blocks)
+
+    def _eval_vel_eq(self):
+        self.model.eval_vel_eq()
+        return np.concatenate(self.model.vel_eq_blocks)
+
+    def _eval_acc_eq(self):
+        self.model.eval_acc_eq()
+        return np.concatenate(self.model.acc_eq_blocks)
+
+    def _eval_frc_eq(self):
+        self.model.eval_frc_eq()
+        return np.concatenate(self.model.frc_eq_blocks)
+
+    def _eval_jac_eq(self):
+        model = self.model
+        model.eval_jac_eq()
+        if self._jac_assembler is None:
+            rows = np.asarray(model.jac_rows) - getattr(model, 'rows_offset', 0)
+            shape = (self.nc, self.n)
+            self._jac_assembler = block_sparse_assembler(rows, model.jac_cols,
+                                                         model.jac_eq_blocks,
+                                                         shape)
+        return self._jac_assembler.assemble(model.jac_eq_blocks)
+
+    def _eval_mass_eq(self):
+        model = self.model
+        model.eval_mass_eq()
+        if self._mass_assembler is None:
+            indices = np.arange(len(model.mass_eq_blocks))
+            shape = (self.n, self.n)
+            self._mass_assembler = block_sparse_assembler(indices, indices,
+                                                          model.mass_eq_blocks,
+                                                          shape)
+        return self._mass_assembler.assemble(model.mass_eq_blocks)
+
+    def _store_state(self, i):
+        self.pos_history[i] = self._pos.copy()
+        self.vel_history[i] = self._vel.copy()
+        self.acc_history[i] = self._acc.copy()
+
+    def _creat_time_array(self, duration, spacing):
+        self.time_array = np.arange(0, duration + spacing/2, spacing)
+        self.step_size  = spacing
+
+###############################################################################
+###############################################################################
+
+class kinematic_solver(abstract_solver):
+    """
+    A kinematic analysis solver of fully-constrained numerical topologies,
+    where the number of constraints equals the number of the generalized
+    coordinates.
+
+    The position level is solved by a modified Newton-Raphson scheme that
+    reuses the sparse LU factorization of the jacobian across iterations and
+    time steps, and only refactors the jacobian when the convergence rate
+    degrades. The velocity and acceleration levels are solved by
+    back-substitution using the same factorization, refined iteratively
+    against the current jacobian.
+
+    Parameters
+    ----------
+    model : object
+        An instance of a generated numerical topology class.
+    tol : float, optional
+        The position level convergence tolerance. Defaults to 1e-5.
+    max_iterations : int, optional
+        The maximum number of Newton-Raphson iterations per time step.
+        Defaults to 50.
+    contraction : float, optional
+        The maximum accepted ratio between the norms of two successive
+        Newton-Raphson corrections, where a slower convergence triggers a
+        refactorization of the jacobian. Defaults to 0.5.
+
+    Attributes
+    ----------
+    iterations : numpy.ndarray
+        The number of Newton-Raphson iterations of each time step.
+    factorizations : numpy.ndarray
+        The number of jacobian factorizations of each time step.
+    lagrange_multipliers : dict
+        The lagrange multipliers at each time step, evaluated only if
+        `solve` is called with `lagrange_multipliers=True`.
+    """
+
+    def __init__(self, model, tol=1e-5, max_iterations=50, contraction=0.5):
+        super().__init__(model)
+        if self.nc != self.n:
+            raise ValueError('Model is not fully constrained! nc = %s, n = %s'
+                             %(self.nc, self.n))
+        self.tol = tol
+        self.max_iterations = max_iterations
+        self.contraction = contraction
+        self._lu = None
+        self.lagrange_multipliers = {}
+
+    @property
+    def total_factorizations(self):
+        return int(np.sum(self.factorizations))
+
+    def solve(self, duration, spacing, lagrange_multipliers=False):
+        """
+        Solve the kinematics of the model over the given duration.
+
+        Parameters
+        ----------
+        duration : float
+            The simulation end time.
+        spacing : float
+            The time step size.
+        lagrange_multipliers : bool, optional
+            Evaluate the lagrange multipliers of the constraints, i.e. the
+            inverse dynamics of the model, at each time step.
+
+        Returns
+        -------
+        None
+        """
+        self._creat_time_array(duration, spacing)
+        nsteps = len(self.time_array)
+        self.iterations = np.zeros(nsteps, dtype=np.int64)
+        self.factorizations = np.zeros(nsteps, dtype=np.int64)
+
+        for i, t in enumerate(self.time_array):
+            self._step = i
+            self._set_time(t)
+            if i > 0:
+                # second-order prediction of the new position.
+                h = t - self.time_array[i-1]
+                self._pos = self._pos + h*self._vel + 0.5*(h**2)*self._acc
+
+            self._solve_pos()
+            self._solve_vel()
+            self._solve_acc()
+            if lagrange_multipliers:
+                self.lagrange_multipliers[i] = self._solve_lagrange_multipliers()
+            self._store_state(i)
+
+    def _factorize(self, jac):
+        self._lu = splinalg.splu(jac.tocsc())
+        self.factorizations[self._step] += 1
+
+    def _solve_pos(self):
+        q = self._pos
+        self._set_gen_coordinates(q)
+        if self._lu is None:
+            self._factorize(self._eval_jac_eq())
+
+        previous_norm = np.inf
+        fresh = False
+        for itr in range(self.max_iterations):
+            residual = self._eval_pos_eq()
+            delta = self._lu.solve(-residual)
+            q = q + delta
+            self._set_gen_coordinates(q)
+
+            norm = np.linalg.norm(delta)
+            self.iterations[self._step] += 1
+            if norm <= self.tol:
+                self._pos = q
+                return
+
+            if fresh:
+                # the first correction using a fresh factorization should at
+                # least improve on the correction that triggered it.
+                if norm > previous_norm:
+                    break
+                fresh = False
+            elif norm > self.contraction * previous_norm:
+                # the convergence has degraded, refactoring at the current
+                # position.
+                self._factorize(self._eval_jac_eq())
+                fresh = True
+            previous_norm = norm
+
+        raise RuntimeError('Position level did not converge at t = %s, '
+                           'after %s iterations!'%(self.model.t, itr + 1))
+
+    def _back_substitute(self, jac, rhs, trans='N'):
+        """
+        Solve the linear system of the given jacobian using the reused LU
+        factorization, refining the solution iteratively against the given
+        jacobian, and refactoring if the refinement does not converge.
+        """
+        lu = self._lu
+        matrix = (jac if trans == 'N' else jac.T)
+        x = lu.solve(rhs, trans=trans)
+        scale = max(np.linalg.norm(rhs), 1.0)
+        for _ in range(self.max_iterations):
+            r = rhs - matrix.dot(x)
+            if np.linalg.norm(r) <= 1e-10 * scale:
+                return x
+            x = x + lu.solve(r, trans=trans)
+        self._factorize(jac)
+        return self._lu.solve(rhs, trans=trans)
+
+    def _solve_vel(self):
+        jac = self._eval_jac_eq()
+        self._current_jac = jac
+        rhs = -self._eval_vel_eq()
+        self._vel = self._back_substitute(jac, rhs)
+        self._set_gen_velocities(self._vel)
+
+    def _solve_acc(self):
+        rhs = -self._eval_acc_eq()
+        self._acc = self._back_substitute(self._current_jac, rhs)
+        self._set_gen_accelerations(self._acc)
+
+    def _solve_lagrange_multipliers(self):
+        mass = self._eval_mass_eq()
+        applied = self._eval_frc_eq()
+        rhs = applied - mass.dot(self._acc)
+        Lambda = self._back_substitute(self._current_jac, rhs, trans='T')
+        self.model.set_lagrange_multipliers(Lambda)
+        return Lambda
+
+
+###############################################################################
+###############################################################################
+
+class dynamic_solver(abstract_solver):
+    """
+    A dynamic analysis solver that integrates the index-3 differential
+    algebraic equations of motion
+
+        M qdd + J.T Lambda = Q
+        Phi(q, t) = 0
+
+    using the HHT-alpha method, as formulated by Negrut et al. for multi-body
+    systems, with either a fixed or an adaptive time step.
+
+    At each time step, the augmented system [[M/(1+alpha), J.T], [J, 0]] is
+    assembled once from the preallocated block structure and factorized, and
+    the step is solved by quasi-Newton iterations on the accelerations and
+    the lagrange multipliers that reuse this factorization.
+
+    Parameters
+    ----------
+    model : object
+        An instance of a generated numerical topology class.
+    alpha : float, optional
+        The HHT-alpha numerical damping parameter, within [-1/3, 0], where 0
+        recovers the trapezoidal rule. Defaults to -0.1.
+    tol : float, optional
+        The convergence tolerance of the position corrections. Defaults to
+        1e-6.
+    max_iterations : int, optional
+        The maximum number of quasi-Newton iterations per time step.
+        Defaults to 25.
+    rtol : float, optional
+        The relative tolerance of the local error estimate, used by the
+        adaptive time stepping. Defaults to 1e-3.
+    atol : float, optional
+        The absolute tolerance of the local error estimate, used by the
+        adaptive time stepping. Defaults to 1e-3.
+
+    Attributes
+    ----------
+    time_history : dict
+        The time value at each stored step.
+    lagrange_multipliers : dict
+        The lagrange multipliers at each stored step.
+    iterations : list
+        The number of quasi-Newton iterations of each stored step.
+    rejected_steps : int
+        The number of rejected steps of the adaptive time stepping.
+    timings : dict
+        The accumulated wall-time in seconds spent in the evaluation of the
+        'residual' equations, the 'assembly' of the augmented matrix, its
+        'factorization' and the 'solve' of the linear systems.
+    """
+
+    def __init__(self, model, alpha=-0.1, tol=1e-6, max_iterations=25,
+                 rtol=1e-3, atol=1e-3):
+        super().__init__(model)
+        if not -1/3 <= alpha <= 0:
+            raise ValueError('alpha should be within [-1/3, 0], got %s'%alpha)
+        self.alpha = alpha
+        self.beta  = (1 - alpha)**2 / 4
+        self.gamma = (1 - 2*alpha) / 2
+        self.tol = tol
+        self.max_iterations = max_iterations
+        self.rtol = rtol
+        self.atol = atol
+
+        self._augmented_assembler = None
+        self._lagrange = np.zeros((self.nc, 1))
+
+        self.time_history = {}
+        self.lagrange_multipliers = {}
+        self.iterations = []
+        self.rejected_steps = 0
+        self.timings = {'residual': 0.0, 'assembly': 0.0,
+                        'factorization': 0.0, 'solve': 0.0}
+
+    def solve(self, duration, spacing, adaptive=False, min_step=None,
+              max_step=None):
+        """
+        Integrate the equations of motion over the given duration.
+
+        Parameters
+        ----------
+        duration : float
+            The simulation end time.
+        spacing : float
+            The time step size, used as the initial step size if `adaptive`
+            is True.
+        adaptive : bool, optional
+            Adapt the step size to keep the estimated local error within the
+            `rtol` and `atol` tolerances.
+        min_step : float, optional
+            The minimum step size of the adaptive time stepping. Defaults to
+            `spacing * 1e-4`.
+        max_step : float, optional
+            The maximum step size of the adaptive time stepping. Defaults to
+            `spacing * 100`.
+
+        Returns
+        -------
+        None
+        """
+        min_step = (spacing * 1e-4 if min_step is None else min_step)
+        max_step = (spacing * 100 if max_step is None else max_step)
+
+        t = 0.0
+        self._solve_initial_conditions()
+        self._store_step(0, t, 0)
+
+        h = spacing
+        i = 1
+        while t < duration - 1e-12 * spacing:
+            h = min(h, duration - t)
+            converged, iterations = self._solve_step(t, h)
+
+            if adaptive:
+                error = (self._estimate_error(h) if converged else np.inf)
+                if error > 1:
+                    self.rejected_steps += 1
+                    if h <= min_step:
+                        raise RuntimeError('Step size reached the minimum '
+                                           'step at t = %s!'%t)
+                    factor = (0.5 if not converged else
+                              max(0.2, 0.9 * error**(-1/3)))
+                    h = max(h * factor, min_step)
+                    continue
+            elif not converged:
+                raise RuntimeError('Step did not converge at t = %s, after %s '
+                                   'iterations!'%(t + h, iterations))
+
+            self._accept_step()
+            t += h
+            self._store_step(i, t, iterations)
+            i += 1
+
+            if adaptive:
+                factor = min(2.0, 0.9 * max(error, 1e-10)**(-1/3))
+                h = min(max(h * factor, min_step), max_step)
+
+        self.time_array = np.array(list(self.time_history.values()))
+
+    def _solve_initial_conditions(self):
+        """
+        Solve for the initial accelerations and lagrange multipliers that are
+        consistent with the initial positions and velocities.
+
+        The initial velocities are first projected onto the velocity
+        constraints by the mass-weighted minimum-norm correction, solved by
+        the same augmented factorization, as the first steps would otherwise
+        correct the inconsistency by accelerations of order 1/h**2.
+        """
+        self._set_time(0)
+        self._set_gen_coordinates(self._pos)
+        self._set_gen_velocities(self._vel)
+        mass, jac, _, _ = self._eval_residual_equations()
+        lu  = self._factorize(mass, jac, 1.0)
+
+        residual = -(self._eval_vel_eq() + jac.dot(self._vel))
+        rhs = np.concatenate([np.zeros((self.n, 1)), residual])
+        self._vel = self._vel + self._linear_solve(lu, rhs)[:self.n]
+        self._set_gen_velocities(self._vel)
+
+        applied = self._eval_frc_eq()
+        rhs = np.concatenate([applied, -self._eval_acc_eq()])
+        solution = self._linear_solve(lu, rhs)
+        self._acc = solution[:self.n]
+        self._lagrange = solution[self.n:]
+        self._set_gen_accelerations(self._acc)
+        self._generalized_forces = jac.T.dot(self._lagrange) - applied
+
+    def _solve_step(self, t, h):
+        """
+        Solve the HHT-alpha step from time t to t + h, storing the solution
+        as the candidate state of the step.
+        """
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+        n = self.n
+        q0, qd0, qdd0 = self._pos, self._vel, self._acc
+
+        qdd = qdd0.copy()
+        Lambda = self._lagrange.copy()
+        self._set_time(t + h)
+
+        for itr in range(self.max_iterations):
+            q  = q0 + h*qd0 + (h**2/2)*((1 - 2*beta)*qdd0 + 2*beta*qdd)
+            qd = qd0 + h*((1 - gamma)*qdd0 + gamma*qdd)
+            self._set_gen_coordinates(q)
+            self._set_gen_velocities(qd)
+
+            mass, jac, applied, pos_eq = self._eval_residual_equations()
+            if itr == 0:
+                lu = self._factorize(mass, jac, 1/(1 + alpha))
+
+            r1 = (mass.dot(qdd)/(1 + alpha) + jac.T.dot(Lambda) - applied
+                  - (alpha/(1 + alpha))*self._generalized_forces)
+            r2 = pos_eq / (beta * h**2)
+            delta = self._linear_solve(lu, -np.concatenate([r1, r2]))
+
+            qdd = qdd + delta[:n]
+            Lambda = Lambda + delta[n:]
+            if np.linalg.norm(beta * h**2 * delta[:n]) <= self.tol:
+                break
+        else:
+            return False, itr + 1
+
+        q  = q0 + h*qd0 + (h**2/2)*((1 - 2*beta)*qdd0 + 2*beta*qdd)
+        qd = qd0 + h*((1 - gamma)*qdd0 + gamma*qdd)
+        self._candidate = (q, qd, qdd, Lambda)
+        return True, itr + 1
+
+    def _accept_step(self):
+        q, qd, qdd, Lambda = self._candidate
+        self._pos, self._vel, self._acc = q, qd, qdd
+        self._lagrange = Lambda
+        self._set_gen_coordinates(q)
+        self._set_gen_velocities(qd)
+        self._set_gen_accelerations(qdd)
+
+        start = time.perf_counter()
+        applied = self._eval_frc_eq()
+        jac = self._eval_jac_eq()
+        self.timings['residual'] += time.perf_counter() - start
+        self._generalized_forces = jac.T.dot(Lambda) - applied
+
+    def _estimate_error(self, h):
+        """
+        Estimate the normalized local truncation error of the positions of the
+        candidate step, using the Zienkiewicz-Xie estimator of the Newmark
+        family of methods.
+        """
+        q, _, qdd, _ = self._candidate
+        error = h**2 * abs(self.beta - 1/6) * (qdd - self._acc)
+        scale = self.atol + self.rtol * np.maximum(np.abs(q), np.abs(self._pos))
+        return np.sqrt(np.mean((error / scale)**2))
+
+    def _eval_residual_equations(self):
+        start = time.perf_counter()
+        mass = self._eval_mass_eq()
+        jac = self._eval_jac_eq()
+        applied = self._eval_frc_eq()
+        pos_eq = self._eval_pos_eq()
+        self.timings['residual'] += time.perf_counter() - start
+        return mass, jac, applied, pos_eq
+
+    def _factorize(self, mass, jac, mass_scale):
+        start = time.perf_counter()
+        if self._augmented_assembler is None:
+            self._augmented_assembler = augmented_assembler(mass, jac)
+        matrix = self._augmented_assembler.assemble(mass, jac, mass_scale)
+        self.timings['assembly'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        lu = splinalg.splu(matrix)
+        self.timings['factorization'] += time.perf_counter() - start
+        return lu
+
+    def _linear_solve(self, lu, rhs):
+        start = time.perf_counter()
+        solution = lu.solve(rhs)
+        self.timings['solve'] += time.perf_counter() - start
+        return solution
+
+    def _store_step(self, i, t, iterations):
+        self._store_state(i)
+        self.time_history[i] = t
+        self.lagrange_multipliers[i] = self._lagrange.copy()
+        self.iterations.append(iterations)
+
+
+###############################################################################
+###############################################################################
+
+class partitioned_solver(abstract_solver):
+    """
+    A dynamic analysis solver that uses the embedded coordinate-partitioning
+    method, where the generalized coordinates are partitioned into
+    independent and dependent sets using the numerical jacobian, and only the
+    independent coordinates and velocities are integrated as an ODE system.
+
+    For every evaluation of the ODE system, the dependent coordinates are
+    recovered by a modified Newton-Raphson solution of the position
+    constraints, the dependent velocities by the velocity constraints, and
+    the accelerations from the equations of motion reduced to the independent
+    coordinates. All the linear systems reuse the LU factorization of the
+    dependent coordinates jacobian, which is only refactored when the Newton
+    iterations or the iterative refinement of the solutions converge slowly,
+    or on a new partitioning of the coordinates.
+
+    Parameters
+    ----------
+    model : object
+        An instance of a generated numerical topology class.
+    method : str, optional
+        The name of a `scipy.integrate` ODE solver class, e.g. 'RK45' for
+        an explicit method or 'Radau' and 'BDF' for implicit methods suitable
+        for stiff models. Defaults to 'RK45'.
+    rtol : float, optional
+        The relative tolerance of the ODE integrator. Defaults to 1e-6.
+    atol : float, optional
+        The absolute tolerance of the ODE integrator. Defaults to 1e-6.
+    tol : float, optional
+        The convergence tolerance of the position constraints residuals and
+        the dependent coordinates corrections. Defaults to 1e-9.
+    max_iterations : int, optional
+        The maximum number of Newton-Raphson iterations per evaluation.
+        Defaults to 25.
+    contraction : float, optional
+        The maximum accepted ratio between the norms of two successive
+        Newton-Raphson corrections, where a slower convergence triggers a
+        refactorization of the dependent coordinates jacobian. Defaults to
+        0.1.
+    max_condition_growth : float, optional
+        The maximum accepted growth of the condition estimate of the dependent
+        coordinates jacobian relative to its value at the partitioning time,
+        where a worse-conditioned jacobian triggers a new partitioning of the
+        coordinates. Defaults to 1e2.
+
+    Attributes
+    ----------
+    independent : numpy.ndarray
+        The indices of the current independent coordinates.
+    dependent : numpy.ndarray
+        The indices of the current dependent coordinates.
+    lagrange_multipliers : dict
+        The lagrange multipliers at each time step.
+    evaluations : int
+        The number of evaluations of the ODE system.
+    newton_iterations : int
+        The total number of Newton-Raphson iterations.
+    factorizations : int
+        The total number of factorizations of the dependent jacobian.
+    partitions : int
+        The number of the performed coordinates partitionings.
+    """
+
+    def __init__(self, model, method='RK45', rtol=1e-6, atol=1e-6, tol=1e-9,
+                 max_iterations=25, contraction=0.1, max_condition_growth=1e2):
+        super().__init__(model)
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+        self.tol  = tol
+        self.max_iterations = max_iterations
+        self.contraction = contraction
+        self.max_condition_growth = max_condition_growth
+
+        self._lagrange = np.zeros((self.nc, 1))
+
+        self.lagrange_multipliers = {}
+        self.evaluations = 0
+        self.newton_iterations = 0
+        self.factorizations = 0
+        self.partitions = 0
+
+    def solve(self, duration, spacing):
+        """
+        Integrate the equations of motion over the given duration, storing
+        the states at the given time spacing.
+
+        Parameters
+        ----------
+        duration : float
+            The simulation end time.
+        spacing : float
+            The time spacing of the stored states. The integration steps are
+            selected by the integrator independently.
+
+        Returns
+        -------
+        None
+        """
+        self._creat_time_array(duration, spacing)
+        self._set_time(0)
+        self._accept_state(0.0)
+        self._partition()
+        try:
+            self._integrate(spacing)
+        except _convergence_error as error:
+            raise RuntimeError(str(error)) from None
+
+    def _integrate(self, spacing):
+        integrator_class = getattr(scipy.integrate, self.method)
+        time_array = self.time_array
+        t_end = time_array[-1]
+        t = 0.0
+        k = 0
+        first_step = None
+        while k < len(time_array):
+            integrator = integrator_class(self._eval_ode_system, t,
+                                          self._independent_states(), t_end,
+                                          rtol=self.rtol, atol=self.atol,
+                                          first_step=first_step)
+            while integrator.status == 'running':
+                try:
+                    message = integrator.step()
+                except _convergence_error:
+                    # the dependent coordinates are not solvable within the
+                    # attempted step, re-partitioning at the last accepted
+                    # state and retrying with a smaller step.
+                    if integrator.t == t and first_step is not None:
+                        raise
+                    self._eval_states(integrator.t, integrator.y)
+                    self._accept_state(integrator.t)
+                    self._partition()
+                    t = integrator.t
+                    first_step = (integrator.step_size or spacing) / 4
+                    break
+                if integrator.status == 'failed':
+                    raise RuntimeError(message)
+
+                interpolant = integrator.dense_output()
+                while k < len(time_array) and time_array[k] <= integrator.t:
+                    self._eval_states(time_array[k], interpolant(time_array[k]))
+                    self._store_state(k)
+                    self.lagrange_multipliers[k] = self._lagrange.copy()
+                    k += 1
+
+                # checking the conditioning of the dependent jacobian at the
+                # accepted state, and continuing with a new partitioning of
+                # the coordinates if it has degraded.
+                self._eval_states(integrator.t, integrator.y)
+                self._accept_state(integrator.t)
+                growth = self._estimate_condition() / self._reference_condition
+                if growth > self.max_condition_growth and integrator.t < t_end:
+                    self._partition()
+                    t = integrator.t
+                    first_step = integrator.step_size
+                    break
+                first_step = None
+
+    def _partition(self):
+        """
+        Select the dependent coordinates as the columns pivoted first by the
+        QR factorization of the jacobian at the current configuration, and
+        the independent coordinates as the remaining columns.
+        """
+        self._set_gen_coordinates(self._pos)
+        jac = self._eval_jac_eq().toarray()
+        _, _, pivots = scipy.linalg.qr(jac, mode='economic', pivoting=True)
+        self.dependent = np.sort(pivots[:self.nc])
+        self.independent = np.sort(pivots[self.nc:])
+        self._factorize(self._eval_jac_eq()[:, self.dependent])
+        self._reference_condition = self._estimate_condition()
+        self.partitions += 1
+
+    def _accept_state(self, t):
+        self._accepted_state = (t, self._pos.copy(), self._vel.copy(),
+                                self._acc.copy())
+
+    def _independent_states(self):
+        ind = self.independent
+        return np.concatenate([self._pos[ind, 0], self._vel[ind, 0]])
+
+    def _eval_ode_system(self, t, y):
+        """
+        Evaluate the ODE system for the integrator, where the states that
+        overflow the model equations, e.g. the diverging Newton iterates of
+        the implicit integrators, are returned non-finite derivatives so that
+        the integrator rejects them and reduces its step.
+        """
+        try:
+            with np.errstate(over='raise', invalid='raise'):
+                return self._eval_states(t, y)
+        except FloatingPointError:
+            return np.full_like(y, np.nan)
+
+    def _eval_states(self, t, y):
+        self.evaluations += 1
+        ind, dep = self.independent, self.dependent
+        nind = len(ind)
+        self._set_time(t)
+
+        # second-order prediction of the dependent coordinates from the last
+        # accepted state.
+        t0, q0, qd0, qdd0 = self._accepted_state
+        h = t - t0
+        q = q0 + h*qd0 + 0.5*(h**2)*qdd0
+        q[ind, 0] = y[:nind]
+        q = self._solve_dependent_coordinates(q)
+
+        jac = self._eval_jac_eq().tocsc()
+        jac_v = jac[:, ind]
+        self._jac_u = jac[:, dep]
+
+        qd = np.zeros_like(q)
+        qd[ind, 0] = y[nind:]
+        rhs = -(self._eval_vel_eq() + jac_v.dot(qd[ind]))
+        qd[dep] = self._back_substitute(rhs)
+        self._set_gen_velocities(qd)
+
+        qdd, self._lagrange = self._solve_accelerations(jac_v)
+        self._pos, self._vel, self._acc = q, qd, qdd
+        return np.concatenate([qd[ind, 0], qdd[ind, 0]])
+
+    def _solve_dependent_coordinates(self, q):
+        dep = self.dependent
+        self._set_gen_coordinates(q)
+        previous_norm = np.inf
+        refactored = False
+        for itr in range(self.max_iterations):
+            residual = self._eval_pos_eq()
+            norm = np.linalg.norm(residual)
+            if norm <= self.tol:
+                return q
+            if not np.isfinite(norm):
+                break
+            delta = self._lu.solve(-residual)
+            q[dep] += delta
+            self._set_gen_coordinates(q)
+            self.newton_iterations += 1
+            delta_norm = np.linalg.norm(delta)
+            if delta_norm <= self.tol:
+                return q
+            if delta_norm > self.contraction * previous_norm and not refactored:
+                # slow convergence of the reused factorization.
+                self._factorize(self._eval_jac_eq()[:, dep])
+                refactored = True
+            previous_norm = delta_norm
+
+        raise _convergence_error('Dependent coordinates did not converge at '
+                                 't = %s, after %s iterations!'
+                                 %(self.model.t, itr + 1))
+
+    def _factorize(self, jac_u):
+        self._jac_u = jac_u.tocsc()
+        self._lu = splinalg.splu(self._jac_u)
+        self.factorizations += 1
+
+    def _estimate_condition(self):
+        """
+        Estimate the 1-norm condition number of the current dependent
+        coordinates jacobian.
+        """
+        inverse = splinalg.LinearOperator(self._jac_u.shape,
+                                          matvec=self._back_substitute,
+                                          rmatvec=lambda x: self._back_substitute(x, trans='T'))
+        return splinalg.onenormest(self._jac_u) * splinalg.onenormest(inverse)
+
+    def _back_substitute(self, rhs, trans='N'):
+        """
+        Solve the linear system of the current dependent coordinates jacobian
+        using the reused LU factorization, refining the solution iteratively
+        against the current jacobian, and refactoring if the refinement does
+        not converge.
+        """
+        lu = self._lu
+        matrix = (self._jac_u if trans == 'N' else self._jac_u.T)
+        x = lu.solve(rhs, trans=trans)
+        scale = max(np.linalg.norm(rhs), 1.0)
+        for _ in range(self.max_iterations):
+            r = rhs - matrix.dot(x)
+            if np.linalg.norm(r) <= 1e-10 * scale:
+                return x
+            x = x + lu.solve(r, trans=trans)
+        self._factorize(self._jac_u)
+        return self._lu.solve(rhs, trans=trans)
+
+    def _solve_accelerations(self, jac_v):
+        """
+        Solve the accelerations from the equations of motion reduced to the
+        independent coordinates, then the lagrange multipliers from the
+        dependent rows of the equations of motion.
+
+        The acceleration constraints are partitioned as
+        Ju qdd_u + Jv qdd_v = -gamma, giving qdd = B qdd_v + c, where the
+        reduced system is (B.T M B) qdd_v = B.T (Q - M c).
+        """
+        ind, dep = self.independent, self.dependent
+        nind = len(ind)
+        mass = self._eval_mass_eq()
+        applied = self._eval_frc_eq()
+
+        # the embedding matrix and the offset of the dependent accelerations,
+        # solved together as a multiple right-hand sides system.
+        rhs = np.hstack([-jac_v.toarray(), -self._eval_acc_eq()])
+        solution = self._back_substitute(rhs)
+        embedding = np.zeros((self.n, nind))
+        embedding[ind, np.arange(nind)] = 1
+        embedding[dep] = solution[:, :nind]
+        offset = np.zeros((self.n, 1))
+        offset[dep] = solution[:, nind:]
+
+        reduced_mass = embedding.T.dot(mass.dot(embedding))
+        reduced_frc  = embedding.T.dot(applied - mass.dot(offset))
+        qdd = embedding.dot(np.linalg.solve(reduced_mass, reduced_frc)) + offset
+
+        Lambda = self._back_substitute((applied - mass.dot(qdd))[dep], trans='T')
+        return qdd, Lambda
+
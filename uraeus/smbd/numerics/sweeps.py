@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# Standard library imports
+import os
+import json
+import itertools
+import concurrent.futures
+
+# 3rd party library imports
+import numpy as np
+
+# Local applicataion imports
+from .solvers import kinematic_solver, dynamic_solver, partitioned_solver
+
+###############################################################################
+
+solvers = {'kinematic'  : kinematic_solver,
+           'dynamic'    : dynamic_solver,
+           'partitioned': partitioned_solver}
+
+# The numerical model of the worker process, constructed once per worker by
+# the pool initializer.
+_worker_model = None
+
+###############################################################################
+###############################################################################
+
+def _init_worker(topology_class, inputs_class, configuration_class):
+    global _worker_model
+    _worker_model = _sweep_model(topology_class, inputs_class,
+                                 configuration_class)
+
+def _run_worker(task):
+    return _worker_model.run(*task)
+
+
+class _sweep_model(object):
+    """
+    A numerical model that is constructed once and re-configured for each
+    run of the sweep.
+    """
+
+    def __init__(self, topology_class, inputs_class, configuration_class):
+        self.topology = topology_class()
+        self.inputs_class = inputs_class
+        self.configuration_class = configuration_class
+
+    def run(self, run_id, inputs, analysis, duration, spacing, options):
+        try:
+            self._configure(inputs)
+            solver = solvers[analysis](self.topology, **options)
+            if analysis == 'kinematic':
+                solver.solve(duration, spacing, lagrange_multipliers=True)
+            else:
+                solver.solve(duration, spacing)
+        except Exception as e:
+            return run_id, {'error': '%s: %s'%(e.__class__.__name__, e)}
+        return run_id, self._collect(solver)
+
+    def _configure(self, inputs):
+        inputs_instance = self.inputs_class('sweep')
+        for name, value in inputs.items():
+            current = getattr(inputs_instance, name)
+            if isinstance(current, np.ndarray):
+                value = np.asarray(value, dtype=np.float64).reshape(current.shape)
+            setattr(inputs_instance, name, value)
+
+        config = self.configuration_class()
+        config.assemble(inputs_instance)
+        self.topology.config = config
+        self.topology.initialize()
+
+    @staticmethod
+    def _collect(solver):
+        steps = sorted(solver.pos_history)
+        results = {'time' : np.asarray(solver.time_array)[:len(steps)],
+                   'pos'  : np.hstack([solver.pos_history[i] for i in steps]).T,
+                   'vel'  : np.hstack([solver.vel_history[i] for i in steps]).T,
+                   'acc'  : np.hstack([solver.acc_history[i] for i in steps]).T}
+        if solver.lagrange_multipliers:
+            results['lagrange'] = np.hstack([solver.lagrange_multipliers[i]
+                                             for i in steps]).T
+        return results
+
+###############################################################################
+###############################################################################
+
+class sweep_runner(object):
+    """
+    A parameter sweep runner that evaluates a numerical topology against
+    multiple configuration input sets, distributing the runs over a pool of
+    worker processes.
+
+    The generated classes are sent to each worker once on its creation,
+    where each worker constructs its own numerical topology instance that is
+    re-configured for every run, i.e. only the input sets are sent per run.
+
+    Parameters
+    ----------
+    topology_class : type
+        The generated numerical topology class.
+    inputs_class : type
+        The generated configuration inputs class.
+    configuration_class : type
+        The generated numerical configuration class.
+    analysis : str, {'kinematic', 'dynamic', 'partitioned'}
+        The type of the analysis of each run. Defaults to 'kinematic'.
+    processes : int, optional
+        The number of worker processes. Defaults to the number of CPUs. If
+        set to 0, the runs are evaluated sequentially in the current
+        process.
+    checkpoint : str, optional
+        The path of a directory used to store the results of the finished
+        runs, where the runs already stored in the directory are skipped
+        when the sweep is resumed. The sweep should be resumed with the same
+        analysis and run parameters as the stored runs.
+    **options
+        The keyword arguments passed to the solver of each run.
+
+    Notes
+    -----
+    The generated classes should be importable by the worker processes, i.e.
+    defined in modules on the python path, as they are pickled by reference.
+    """
+
+    def __init__(self, topology_class, inputs_class, configuration_class,
+                 analysis='kinematic', processes=None, checkpoint=None,
+                 **options):
+        if analysis not in solvers:
+            raise ValueError('Unknown analysis %r, expected one of %s'
+                             %(analysis, tuple(solvers)))
+        self.topology_class = topology_class
+        self.inputs_class = inputs_class
+        self.configuration_class = configuration_class
+        self.analysis = analysis
+        self.processes = (os.cpu_count() if processes is None else processes)
+        self.checkpoint = checkpoint
+        self.options = options
+
+        self.completed = set()
+        self.failed = {}
+        self.parameters = None
+        if checkpoint is not None:
+            os.makedirs(checkpoint, exist_ok=True)
+            self._load_manifest()
+
+    def run(self, input_sets, duration, spacing):
+        """
+        Run the sweep over the given input sets, yielding the results of
+        each run as soon as it finishes.
+
+        Parameters
+        ----------
+        input_sets : iterable (of dict)
+            The configuration input sets, where each set maps the names of
+            the configuration inputs to their values. The input sets are
+            identified by their order in the iterable, which should be
+            preserved when resuming a checkpointed sweep.
+        duration : float
+            The simulation end time of each run.
+        spacing : float
+            The time step size of each run.
+
+        Yields
+        ------
+        run_id : int
+            The index of the run input set.
+        results : dict
+            The 'time', 'pos', 'vel', 'acc' and 'lagrange' arrays of the run,
+            where each row is a time step, or an 'error' message if the run
+            has failed.
+
+        Raises
+        ------
+        ValueError
+            If the run parameters differ from the ones of the checkpointed
+            runs.
+        """
+        parameters = {'duration': duration, 'spacing': spacing}
+        if self.parameters is not None and self.parameters != parameters:
+            raise ValueError('The checkpointed runs parameters %s do not match '
+                             'the run parameters %s.'
+                             %(self.parameters, parameters))
+        self.parameters = parameters
+        if self.checkpoint is not None:
+            self._save_manifest()
+
+        tasks = ((i, inputs, self.analysis, duration, spacing, self.options)
+                 for i, inputs in enumerate(input_sets)
+                 if i not in self.completed)
+        return self._run(tasks)
+
+    def load(self, run_id):
+        """
+        Load the stored results of a checkpointed run.
+        """
+        with np.load(self._run_path(run_id)) as data:
+            return dict(data)
+
+    def _run(self, tasks):
+        if self.processes == 0:
+            model = _sweep_model(self.topology_class, self.inputs_class,
+                                 self.configuration_class)
+            results = (model.run(*task) for task in tasks)
+        else:
+            results = self._run_pool(tasks)
+
+        for run_id, result in results:
+            self._record(run_id, result)
+            yield run_id, result
+
+    def _run_pool(self, tasks):
+        initargs = (self.topology_class, self.inputs_class,
+                    self.configuration_class)
+        with concurrent.futures.ProcessPoolExecutor(self.processes,
+                                                    initializer=_init_worker,
+                                                    initargs=initargs) as pool:
+            # keeping a bounded number of pending runs, so that the input sets
+            # are consumed lazily.
+            pending = {pool.submit(_run_worker, task)
+                       for task in itertools.islice(tasks, 2*self.processes)}
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for task in itertools.islice(tasks, len(done)):
+                    pending.add(pool.submit(_run_worker, task))
+                for future in done:
+                    yield future.result()
+
+    def _record(self, run_id, result):
+        if 'error' in result:
+            self.failed[run_id] = result['error']
+        else:
+            self.completed.add(run_id)
+            self.failed.pop(run_id, None)
+            if self.checkpoint is not None:
+                np.savez(self._run_path(run_id), **result)
+        if self.checkpoint is not None:
+            self._save_manifest()
+
+    def _run_path(self, run_id):
+        return os.path.join(self.checkpoint, 'run_%s.npz'%run_id)
+
+    def _manifest_path(self):
+        return os.path.join(self.checkpoint, 'sweep.json')
+
+    def _load_manifest(self):
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest['analysis'] != self.analysis:
+            raise ValueError('The checkpointed runs analysis %r does not match '
+                             'the sweep analysis %r.'
+                             %(manifest['analysis'], self.analysis))
+        self.parameters = manifest.get('parameters')
+        self.completed = {i for i in manifest['completed']
+                          if os.path.exists(self._run_path(i))}
+        self.failed = {int(k): v for k, v in manifest['failed'].items()}
+
+    def _save_manifest(self):
+        manifest = {'analysis'  : self.analysis,
+                    'parameters': self.parameters,
+                    'completed' : sorted(self.completed),
+                    'failed'    : self.failed}
+        temp_path = self._manifest_path() + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(temp_path, self._manifest_path())
+
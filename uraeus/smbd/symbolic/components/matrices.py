@@ -8,9 +8,17 @@ Created on Tue Jan  1 10:47:50 2019
 # 3rd parties libraries imports
 import sympy as sm
 import networkx as nx
-import matplotlib.pyplot as plt
 
-sm.init_printing(pretty_print=False, use_latex='mathjax', forecolor='White')
+def init_printing(**kwargs):
+    """
+    Initialize the sympy printing of the symbolic expressions, e.g. the latex
+    rendering in jupyter notebooks. The printing setup is opt-in, and the
+    given keyword arguments over-ride the defaults passed to the 
+    `sympy.init_printing`.
+    """
+    settings = dict(pretty_print=False, use_latex='mathjax', forecolor='White')
+    settings.update(kwargs)
+    sm.init_printing(**settings)
 
 ###############################################################################
 ###############################################################################
@@ -433,6 +441,7 @@ class global_frame(object):
         Draw the directed graph tree using matplotlib.pyplot with the nodes
         labled.
         """
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10,6))
         nx.draw(self.references_tree,with_labels=True)
         plt.show()
@@ -6,13 +6,13 @@ Created on Mon Feb 11 09:44:13 2019
 """
 # Standard library imports
 import itertools
+import contextlib
 
 # 3rd party libraries imports
 import sympy as sm
 import numpy as np
 import networkx as nx
 #import pandas as pd
-import matplotlib.pyplot as plt
 
 # Local application imports
 from ..components.matrices import (AbstractMatrix, vector, quatrenion, 
@@ -202,6 +202,7 @@ class relational_graph(object):
     def __init__(self, name):
         self.name = name
         self.graph = nx.DiGraph(name=self.name)
+        self._nodes_classes = None
         
     @property
     def input_nodes(self):
@@ -217,6 +218,7 @@ class relational_graph(object):
     
     def add_node(self, name, **kwargs):
         self.graph.add_node(name, **kwargs)
+        self._invalidate_nodes_classes()
 
     def add_relation(self, node, arg_nodes):
         name_attribute = [self._extract_name_and_attr(n) for n in arg_nodes]
@@ -229,11 +231,13 @@ class relational_graph(object):
         graph = self.graph
         edges = self._get_node_predecessors(node)
         sub_graph = graph.edge_subgraph(edges)
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 6))
         nx.draw_networkx(sub_graph, with_labels=True)
         plt.show() 
         
     def draw_graph(self):
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 6))
         nx.draw_circular(self.graph, with_labels=True)
         plt.show()
@@ -244,6 +248,7 @@ class relational_graph(object):
         graph.remove_edges_from(old_edges)
         new_edges = [(i, node, d) for i, d in zip(nbunch, edges_attrs)]
         graph.add_edges_from(new_edges)
+        self._invalidate_nodes_classes()
         
     def _extract_name_and_attr(self, argument):
         graph = self.graph
@@ -265,28 +270,67 @@ class relational_graph(object):
         edges = reversed([e[:-1] for e in nx.edge_bfs(graph, node, 'reverse')])
         return edges
     
-    def _get_input_nodes(self, graph=None):
+    def _get_node_successors(self, node, graph=None):
         if graph is None: graph = self.graph
-        nodes = [i for i,d in graph.in_degree() if d==0]
-        return nodes
+        edges = [e[:2] for e in nx.edge_bfs(graph, node)]
+        return edges
     
-    def _get_output_nodes(self, graph=None):
+    def _get_nodes_descendants(self, nodes, graph=None):
+        """
+        Return the set of the nodes that depend on any of the given nodes, 
+        found in a single breadth-first traversal of their successors.
+        """
         if graph is None: graph = self.graph
-        condition = lambda i,d : d==0 and graph.in_degree(i)!=0
-        nodes = [i for i,d in graph.out_degree() if condition(i,d)]
-        return nodes
+        descendants = {e[1] for e in nx.edge_bfs(graph, list(nodes))}
+        return descendants
+    
+    def _get_input_nodes(self, graph=None):
+        return list(self._get_nodes_classes(graph)['input'])
+    
+    def _get_output_nodes(self, graph=None):
+        return list(self._get_nodes_classes(graph)['output'])
 
     def _get_intermediat_nodes(self, graph=None):
-        if graph is None: graph = self.graph
-        input_nodes = self._get_input_nodes(graph)
-        output_nodes = self._get_output_nodes(graph)
-        edges = itertools.chain(*[self._get_node_predecessors(n, graph) for n in output_nodes])
-        mid_nodes = []
-        for e in edges:
-            node = e[0]
-            if node not in mid_nodes and node not in input_nodes:
-                mid_nodes.append(node)
-        return mid_nodes
+        return list(self._get_nodes_classes(graph)['intermediat'])
+    
+    def _invalidate_nodes_classes(self):
+        self._nodes_classes = None
+    
+    def _get_nodes_classes(self, graph=None):
+        """
+        Return the classification of the graph nodes into input, intermediat 
+        and output nodes, where the classification of the configuration graph 
+        is cached until the graph is edited.
+        """
+        if graph is not None and graph is not self.graph:
+            return self._classify_nodes(graph)
+        graph = self.graph
+        # the graph size is checked as well, to catch the edits done directly 
+        # on the graph object.
+        size = (graph.number_of_nodes(), graph.number_of_edges())
+        cached = self._nodes_classes
+        if cached is None or cached['size'] != size:
+            cached = self._classify_nodes(graph)
+            cached['size'] = size
+            self._nodes_classes = cached
+        return cached
+
+    @staticmethod
+    def _classify_nodes(graph):
+        """
+        Classify the graph nodes in a single linear pass, where the input nodes 
+        have no predecessors, the output nodes have predecessors and no 
+        successors, and the intermediat nodes are the remaining nodes, ordered 
+        topologically.
+        """
+        in_degree = dict(graph.in_degree())
+        out_degree = dict(graph.out_degree())
+        input_nodes = [n for n in graph if in_degree[n] == 0]
+        output_nodes = [n for n in graph if in_degree[n] != 0 and out_degree[n] == 0]
+        mid_nodes = [n for n in nx.topological_sort(graph) 
+                     if in_degree[n] != 0 and out_degree[n] != 0]
+        return {'input': input_nodes, 'intermediat': mid_nodes, 
+                'output': output_nodes}
 
 ###############################################################################
 ###############################################################################
@@ -296,6 +340,8 @@ class abstract_configuration(relational_graph):
     def __init__(self, name, model_instance):
         super().__init__(name)
         self._config = self
+        self._deferred = False
+        self._pending_nodes = {}
         self.topology = model_instance
         self.assemble_base_layer()
         self.geometries_map = {}
@@ -329,14 +375,14 @@ class abstract_configuration(relational_graph):
             node2_attr_dict = self._create_node_dict(node2, symbolic_type, node1, align='l')
             super().add_node(node1, **node1_attr_dict)
             super().add_node(node2, **node2_attr_dict)
-            self._evaluate_node(node1)
+            self._schedule_evaluation(node1)
             if not issubclass(symbolic_type, Geometry):
                 self.add_relation(Mirrored, node2, (node1,))
         else:
             node1 = '%ss_%s'%(sym, name)
             node1_attr_dict = self._create_node_dict(node1, symbolic_type, node1, align='s')
             super().add_node(node1, **node1_attr_dict)
-            self._evaluate_node(node1)
+            self._schedule_evaluation(node1)
         return node1
     
     def add_relation(self, relation, node, arg_nodes, mirror=False):
@@ -349,31 +395,66 @@ class abstract_configuration(relational_graph):
             super().add_relation(node2, args2)
             self._update_node_rhs(node1, relation)
             self._update_node_rhs(node2, relation)
-            self._evaluate_node(node1)
-            self._evaluate_node(node2)
+            self._schedule_evaluation(node1)
+            self._schedule_evaluation(node2)
         else:
             super().add_relation(node, arg_nodes)
             self._update_node_rhs(node, relation)
-            self._evaluate_node(node)
+            self._schedule_evaluation(node)
+    
+    @contextlib.contextmanager
+    def deferred_evaluation(self):
+        """
+        A context manager that defers the evaluation of the edited nodes, 
+        where the nodes added/related within the context are queued and 
+        evaluated only once when the equalities are requested, or when the 
+        `evaluate_pending` method is called.
+
+        Examples
+        --------
+        >>> with config.deferred_evaluation():
+        ...     config.add_node('hpx', vector, 'hp', mirror=True)
+        ...     config.add_relation(Centered, 'hps_c', ('hpr_a', 'hpl_a'))
+        >>> config.assemble_equalities()
+        """
+        deferred = self._deferred
+        self._deferred = True
+        try:
+            yield self
+        finally:
+            self._deferred = deferred
+    
+    def evaluate_pending(self):
+        """
+        Evaluate the queued nodes once, in a topological order.
+        """
+        pending = self._pending_nodes
+        if not pending:
+            return
+        self._pending_nodes = {}
+        sub_graph = self.graph.subgraph(pending)
+        self._evaluate_nodes(nx.topological_sort(sub_graph))
         
     def assemble_equalities(self):
-        self.input_equalities = self._evaluate_nodes(self.input_nodes)
-        self.intermediat_equalities = self._evaluate_nodes(self.intermediat_nodes)
-        self.output_equalities = self._evaluate_nodes(self.output_nodes)
+        self.evaluate_pending()
+        self.input_equalities = self._get_equalities(self.input_nodes)
+        self.intermediat_equalities = self._get_equalities(self.intermediat_nodes)
+        self.output_equalities = self._get_equalities(self.output_nodes)
         
     
     def get_geometries_graph_data(self):
+        self.evaluate_pending()
         graph = self.graph
         geo_graph = graph.edge_subgraph(self._get_node_predecessors(self.geometry_nodes))
         
         input_nodes = self._get_input_nodes(geo_graph)
-        input_equal = self._evaluate_nodes(input_nodes)
+        input_equal = self._get_equalities(input_nodes)
 
         mid_nodes = self._get_intermediat_nodes(geo_graph)
-        mid_equal = self._evaluate_nodes(mid_nodes)
+        mid_equal = self._get_equalities(mid_nodes)
 
         output_nodes = self._get_output_nodes(geo_graph)
-        output_equal = self._evaluate_nodes(output_nodes)
+        output_equal = self._get_equalities(output_nodes)
         
         data = {'input_nodes':input_nodes,
                 'input_equal':input_equal,
@@ -382,16 +463,23 @@ class abstract_configuration(relational_graph):
                 'geometries_map':self.geometries_map}
         return data
 
-    def _create_inputs_dataframe(self):
-        """ nodes  = self.graph.nodes
-        inputs = self.input_nodes
-        condition = lambda i:  isinstance(nodes[i]['lhs_value'], sm.MatrixSymbol)\
-                            or isinstance(nodes[i]['lhs_value'], sm.Symbol)
-        indecies = list(filter(condition, inputs))
-        indecies.sort()
-        shape = (len(indecies),4)
-        dataframe = pd.DataFrame(np.zeros(shape),index=indecies,dtype=np.float64) """
-        raise NotImplementedError
+    @property
+    def inputs_layout(self):
+        """
+        The numerical user inputs of the configuration, as a list of 
+        (node, shape) tuples ordered as the `input_nodes`, where the 
+        functional inputs are excluded.
+        """
+        nodes  = self.graph.nodes
+        layout = []
+        for node in self.input_nodes:
+            lhs_value = nodes[node]['lhs_value']
+            if isinstance(lhs_value, sm.MatrixSymbol):
+                layout.append((node, tuple(lhs_value.shape)))
+            elif isinstance(lhs_value, sm.Symbol) \
+                and not isinstance(lhs_value, Geometry):
+                layout.append((node, ()))
+        return layout
 
     def assemble_base_layer(self):
         edges_data = list(zip(*self.topology.edges(data=True)))
@@ -449,6 +537,7 @@ class abstract_configuration(relational_graph):
                            'mirr':mirr, 'align':align, 'primary':True,
                            'equality':equality}
         self.graph.add_node(name, **attributes_dict)
+        self._invalidate_nodes_classes()
 
     def _assign_geometry_to_body(self, body, geo, eval_inertia=True):
         b = self.bodies[body]['obj']
@@ -460,6 +549,22 @@ class abstract_configuration(relational_graph):
             self.add_relation(CR.Equal_to, J, ('%s.J'%geo,))
             self.add_relation(CR.Equal_to, m, ('%s.m'%geo,))
 
+    def _schedule_evaluation(self, node):
+        if self._deferred:
+            self._pending_nodes[node] = None
+        else:
+            self._evaluate_node(node)
+
+    def _get_equalities(self, nodes):
+        nodes_data = self.graph.nodes
+        equalities = []
+        for node in nodes:
+            equality = nodes_data[node]['equality']
+            if equality is None:
+                equality = self._evaluate_node(node)
+            equalities.append(equality)
+        return equalities
+
     def _evaluate_nodes(self, nodes):
         equalities = [self._evaluate_node(n) for n in nodes]
         return equalities
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party libraries imports
+import networkx as nx
+
+###############################################################################
+###############################################################################
+
+def reverse_cuthill_mckee(graph):
+    """
+    Order the nodes of a given graph using the reverse Cuthill-McKee
+    algorithm, which reduces the bandwidth of the graph adjacency matrix.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        An undirected graph.
+
+    Returns
+    -------
+    order : list
+        The ordered list of the graph nodes.
+    """
+    order = nx.utils.reverse_cuthill_mckee_ordering(graph)
+    return list(order)
+
+
+def minimum_degree(graph):
+    """
+    Order the nodes of a given graph using the minimum-degree heuristic, which
+    reduces the fill-in produced during the sparse LU factorization of the
+    graph adjacency matrix.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+        An undirected graph.
+
+    Returns
+    -------
+    order : list
+        The ordered list of the graph nodes.
+
+    Notes
+    -----
+    The degrees are evaluated exactly on the elimination graph, instead of
+    the approximated degrees of the quotient graph used by the AMD algorithm.
+    This is cheap enough for the size of multi-body graphs, where nodes are
+    bodies rather than scalar coordinates.
+    """
+    elimination_graph = nx.Graph(graph)
+    insertion_order = {n: i for i, n in enumerate(graph.nodes)}
+    order = []
+    while elimination_graph:
+        degrees = elimination_graph.degree()
+        node = min(elimination_graph.nodes,
+                   key=lambda n: (degrees[n], insertion_order[n]))
+        neighbours = list(elimination_graph.neighbors(node))
+
+        # connecting the neighbours of the eliminated node to each-other,
+        # representing the fill-in produced by eliminating the node.
+        fill_edges = [(u, v) for i, u in enumerate(neighbours)
+                      for v in neighbours[i+1:]]
+        elimination_graph.add_edges_from(fill_edges)
+        elimination_graph.remove_node(node)
+        order.append(node)
+    return order
+
+
+orderings = {'rcm': reverse_cuthill_mckee,
+             'amd': minimum_degree}
+
@@ -10,7 +10,7 @@ import itertools
 
 # 3rd party libraries imports
 import sympy as sm
-import matplotlib.pyplot as plt
+import numpy as np
 import networkx as nx
 
 # Local application imports
@@ -20,6 +20,7 @@ from ..components import bodies
 from ..components.joints import absolute_locator
 from ..components.algebraic_constraints import joint_actuator
 from ..components.forces import abstract_force, gravity_force, centrifugal_force
+from .graph_orderings import orderings
 
 ###############################################################################
 
@@ -162,21 +163,25 @@ class abstract_topology(object):
         return sum(eq,[])
     
     def draw_constraints_topology(self):
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 6))
         graph = nx.Graph(self.constraints_graph)
         nx.draw(graph,with_labels=True)
         plt.show()
         
     def draw_forces_topology(self):
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 6))
         nx.draw_spring(self.forces_graph, with_labels=True)
         plt.show()
     
-    def assemble_model(self):
+    def assemble_model(self, reorder=None):
         self._set_global_frame()
         self._assemble_nodes()
         self._assemble_edges()
         self._remove_virtual_edges()
+        if reorder is not None:
+            self._reorder_bodies(reorder)
         self._assemble_constraints_equations()
         self._assemble_forces_equations()
         self._assemble_mass_matrix()
@@ -301,6 +306,87 @@ class abstract_topology(object):
         graph = self.selected_variant
         graph.remove_edges_from(self.virtual_edges)
     
+    def _reorder_bodies(self, method):
+        """
+        Reorder the bodies of the topology graph, i.e. the columns of the 
+        system jacobian and mass matrix, using a fill-reducing ordering of the
+        constraints graph, and reorder the constraints, i.e. the jacobian rows,
+        to match the new columns' order.
+        
+        Parameters
+        ----------
+        method : str, {'rcm', 'amd'}
+            The ordering method, either reverse Cuthill-McKee or minimum 
+            degree ordering.
+        
+        Notes
+        -----
+        The permutations are stored in the `coordinates_permutation` and 
+        `constraints_permutation` lists, where the reordered vectors are 
+        mapped from the original ones as `q_new = q_old[permutation]`, and 
+        back as `q_old[permutation] = q_new`.
+        """
+        graph = self.selected_variant
+        old_nodes = list(graph.nodes)
+        old_coordinates = self._get_coordinates_indicies()
+        old_constraints = self._get_constraints_scalar_indicies()
+        
+        constraints_graph = nx.Graph(self.constraints_graph)
+        constraints_graph.remove_edges_from(nx.selfloop_edges(constraints_graph))
+        order = orderings[method](constraints_graph)
+        order += [n for n in old_nodes if n not in constraints_graph]
+        position = {n: i for i, n in enumerate(order)}
+        
+        # sorting the edges by the position of their last body. The edges are
+        # iterated by their 1st body adjacency, therefore this sorts the rows
+        # of the constraints acting on each body, where the bodies' rows 
+        # blocks follow the new bodies' order.
+        def edge_position(e):
+            u, v = position[e[0]], position[e[1]]
+            return (max(u, v), min(u, v))
+        edges = sorted(graph.edges(keys=True, data=True), key=edge_position)
+        
+        reordered = nx.MultiDiGraph(name=graph.name)
+        reordered.add_nodes_from((n, graph.nodes[n]) for n in order)
+        reordered.add_edges_from(edges)
+        
+        for name, variant in self.variants.items():
+            if variant is graph:
+                self.variants[name] = reordered
+        if self.graph is graph:
+            self.graph = reordered
+        self._selected_variant = reordered
+        
+        new_coordinates = self._get_coordinates_indicies()
+        new_constraints = self._get_constraints_scalar_indicies()
+        
+        self.reordering_method = method
+        self.coordinates_permutation = sum([old_coordinates[n] for n in new_coordinates], [])
+        self.constraints_permutation = sum([old_constraints[n] for n in new_constraints], [])
+    
+    def _get_coordinates_indicies(self):
+        indicies = {}
+        i = 0
+        for n in self.bodies:
+            nodes_n = self.nodes[n]['n']
+            indicies[n] = list(range(i, i + nodes_n))
+            i += nodes_n
+        return indicies
+    
+    def _get_constraints_scalar_indicies(self):
+        indicies = {}
+        i = 0
+        edges = self.constraints_graph.edges
+        for e in itertools.filterfalse(self._is_virtual_edge, edges):
+            nc = edges[e]['nc']
+            indicies[edges[e]['name']] = list(range(i, i + nc))
+            i += nc
+        for n in self.bodies:
+            nc = self.nodes[n]['nc']
+            indicies[n] = list(range(i, i + nc))
+            i += nc
+        return indicies
+    
     def _store_constaints_index(self):
         self._actuators_indicies = {}
         edges   = self.constraints_graph.edges
@@ -327,6 +413,10 @@ class abstract_topology(object):
         vel_rhs   = sm.MutableSparseMatrix(nve, 1, None)
         acc_rhs   = sm.MutableSparseMatrix(nve, 1, None)
         jacobian  = sm.MutableSparseMatrix(nve, cols, None)
+        
+        # storing the vector-equations rows occupied by each constraint and 
+        # each body normalization equation in the system equations.
+        self.constraints_indicies = {}
                 
         row_ind = 0
         for e in edges:
@@ -338,6 +428,7 @@ class abstract_topology(object):
             # tracker of row index based on the current joint type and the history
             # of the loop
             eo_nve = eo.nve + row_ind
+            self.constraints_indicies[edges[e]['name']] = slice(row_ind, eo_nve)
             
             ui = node_index[u]
             vi = node_index[v]
@@ -369,6 +460,7 @@ class abstract_topology(object):
                 equations[row_ind,0] = b.normalized_pos_equation
                 vel_rhs[row_ind,0]   = b.normalized_vel_equation
                 acc_rhs[row_ind,0]   = b.normalized_acc_equation
+            self.constraints_indicies[n] = slice(row_ind, row_ind + b.nve)
             row_ind += b.nve
                 
         self.pos_equations = equations
@@ -668,6 +760,23 @@ class standalone_topology(template_based_topology):
 ###############################################################################
 
 class subsystem(abstract_topology):
+    """
+    An instance of an assembled template topology within an assembly, where
+    the template graph is relabeled by the subsystem name as a prefix.
+
+    The subsystem shares the symbolic bodies and joints of its template, as 
+    well as the template constructed equations and their CSE output, which 
+    are not re-constructed for each subsystem. The equations are expressed 
+    by the un-prefixed template symbols, where the prefix renaming and the 
+    indices offsets of each subsystem are applied by the numerical topology,
+    e.g. the `prefix` of the generated topology classes and the 
+    `indicies_map` passed to their `assemble` method.
+    """
+    
+    # The template attributes that are shared by all its subsystems.
+    _shared_attributes = frozenset(['%s_%s'%(k, a) for a in ('equations', 'rep', 'exp')
+                                    for k in ('pos', 'vel', 'acc', 'jac', 'frc', 'mass')]
+                                   + ['constraints_indicies'])
     
     def __init__(self, name, template):
         if not isinstance(template, template_based_topology):
@@ -675,22 +784,34 @@ class subsystem(abstract_topology):
         self.name = name
         self._set_global_frame()
         self.template = template
-        self.graph = self.template.graph.copy()
-        self.variants = {'base':self.graph}
-        self._selected_variant = self.graph
         self._virtual_bodies = []
         if name != '':
             self._relable()
+        else:
+            self.graph = self.template.graph.copy()
+        self.variants = {'base':self.graph}
+        self._selected_variant = self.graph
+    
+    @property
+    def prefix(self):
+        return ('%s.'%self.name if self.name != '' else '')
+    
+    def __getattr__(self, name):
+        if name in subsystem._shared_attributes:
+            return getattr(self.template, name)
+        raise AttributeError('%r object has no attribute %r'
+                             %(self.__class__.__name__, name))
     
     def _relable(self):
-        graph = self._selected_variant
+        # relabeling the template graph directly into the subsystem graph,
+        # i.e. a single copy of the template graph.
         def label(x): return '%s.%s'%(self.name, x)
         labels_map = {i:label(i) for i in self.template.nodes}
-        graph = nx.relabel_nodes(graph, labels_map)
+        graph = nx.relabel_nodes(self.template.graph, labels_map, copy=True)
         
         mirr_maped = {k:label(v) for k, v in graph.nodes(data='mirr')}
         nx.set_node_attributes(graph, mirr_maped, 'mirr')
-        self.graph = self._selected_variant = graph
+        self.graph = graph
     
 ###############################################################################
 ###############################################################################
@@ -745,8 +866,26 @@ class assembly(abstract_topology):
         self._assemble_constraints_equations()
         self._assemble_forces_equations()
         self._assemble_mass_matrix()
+        self._assemble_global_layout()
+    
+    @property
+    def nested_subsystems(self):
+        subsystems = {}
+        for assm in self.assemblies.values():
+            subsystems.update(assm.nested_subsystems)
+        subsystems.update(self.subsystems)
+        return subsystems
+    
+    @property
+    def nested_interface_map(self):
+        interface_map = {}
+        for assm in self.assemblies.values():
+            interface_map.update(assm.nested_interface_map)
+        interface_map.update(self.interface_map)
+        return interface_map
         
     def draw_interface_graph(self):
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10,6))
         nx.draw_spring(self.interface_graph, with_labels=True)
         plt.show()
@@ -765,58 +904,134 @@ class assembly(abstract_topology):
         
     def _initialize_interface(self):
         self._set_virtual_equalities()
-        for virtual, actual in self.interface_map.items():
-            self._replace_nodes(virtual, actual)
-        self.interface_graph.remove_nodes_from(self.interface_map.keys())
+        self._replace_nodes(self.interface_map)
     
     def _set_virtual_equalities(self):
-        self.mapped_vir_coordinates = []
-        for v,a in self.interface_map.items():
-            self._assemble_node(v)
-            if a!= self.grf : self._assemble_node(a)
-            R_v,P_v = self.nodes[v]['obj'].q.blocks
-            R_a,P_a = self.nodes[a]['obj'].q.blocks
-            R_eq = sm.Eq(R_v, R_a, evaluate=False)
-            P_eq = sm.Eq(P_v, P_a, evaluate=False)
-            self.mapped_vir_coordinates += [R_eq, P_eq]
-        
-        self.mapped_vir_velocities = []
-        for v,a in self.interface_map.items():
-            self._assemble_node(v)
-            if a!= self.grf : self._assemble_node(a)
-            R_v,P_v = self.nodes[v]['obj'].qd.blocks
-            R_a,P_a = self.nodes[a]['obj'].qd.blocks
-            R_eq = sm.Eq(R_v, R_a, evaluate=False)
-            P_eq = sm.Eq(P_v, P_a, evaluate=False)
-            self.mapped_vir_velocities += [R_eq, P_eq]
+        nodes = self.nodes
+        
+        # assembling the interface bodies objects, each is constructed once
+        # even if it is mapped to/from several bodies.
+        assembled = set()
+        for v, a in self.interface_map.items():
+            for n in (v, a):
+                if n not in assembled and n != self.grf:
+                    self._assemble_node(n)
+                    assembled.add(n)
         
+        self.mapped_vir_coordinates   = []
+        self.mapped_vir_velocities    = []
         self.mapped_vir_accelerations = []
-        for v,a in self.interface_map.items():
-            self._assemble_node(v)
-            if a!= self.grf : self._assemble_node(a)
-            R_v,P_v = self.nodes[v]['obj'].qdd.blocks
-            R_a,P_a = self.nodes[a]['obj'].qdd.blocks
-            R_eq = sm.Eq(R_v, R_a, evaluate=False)
-            P_eq = sm.Eq(P_v, P_a, evaluate=False)
-            self.mapped_vir_accelerations += [R_eq, P_eq]
-
+        for v, a in self.interface_map.items():
+            v_obj = nodes[v]['obj']
+            a_obj = nodes[a]['obj']
+            self.mapped_vir_coordinates   += self._map_blocks(v_obj.q, a_obj.q)
+            self.mapped_vir_velocities    += self._map_blocks(v_obj.qd, a_obj.qd)
+            self.mapped_vir_accelerations += self._map_blocks(v_obj.qdd, a_obj.qdd)
+    
+    @staticmethod
+    def _map_blocks(virtual, actual):
+        R_v, P_v = virtual.blocks
+        R_a, P_a = actual.blocks
+        R_eq = sm.Eq(R_v, R_a, evaluate=False)
+        P_eq = sm.Eq(P_v, P_a, evaluate=False)
+        return [R_eq, P_eq]
             
-    def _replace_nodes(self, virtual,actual):
-        a = actual
-        v = virtual
+    def _replace_nodes(self, interface_map):
+        """
+        Replace the virtual nodes by their actual nodes in a single pass, 
+        where the edges of all the virtual nodes are redirected to the 
+        resolved actual nodes, then the virtual nodes are removed at once.
+        """
         H = self.graph
-        new_edges1 = [(w, a, d) for w, x, d in H.in_edges(v, data=True)]
-        new_edges2 = [(a, w, d) for x, w, d in H.out_edges(v, data=True)]
-        H.remove_node(v)
-        new_edges = new_edges1 + new_edges2
+        
+        def resolve(node):
+            while node in interface_map:
+                node = interface_map[node]
+            return node
+        
+        visited = set()
+        new_edges = []
+        for v in interface_map:
+            if v not in H:
+                continue
+            edges = itertools.chain(H.in_edges(v, keys=True, data=True), 
+                                    H.out_edges(v, keys=True, data=True))
+            for u, w, key, d in edges:
+                if (u, w, key) in visited:
+                    continue
+                visited.add((u, w, key))
+                new_edges.append((resolve(u), resolve(w), d))
+        
+        H.remove_nodes_from(interface_map.keys())
         H.add_edges_from(new_edges)
         self.interface_graph.add_edges_from(new_edges)
-            
+        self.interface_graph.remove_nodes_from(interface_map.keys())
     
     def _assemble_edges(self):
         for e in self.interface_graph.edges:
             self._assemble_edge(e)
     
+    def _assemble_global_layout(self):
+        """
+        Evaluate the layout of the global block-sparse jacobian of the 
+        assembly, where the equations of each subsystem occupy a contiguous
+        range of rows-blocks, and the columns of its template bodies are 
+        scattered to the columns of their assembly bodies, where the virtual
+        bodies are resolved to their actual bodies.
+
+        The layout is stored as:
+        
+        - rows_offsets : the offset of the rows-blocks of each subsystem.
+        - interface_indicies : the assembly body index of each node of the 
+          subsystem template, ordered as the template nodes.
+        - jac_rows, jac_cols : the global rows and columns blocks indices of
+          the assembly jacobian blocks, followed by the subsystems jacobians 
+          blocks, each ordered as its template jacobian blocks.
+        - jac_slices : the slice of each subsystem blocks in the jac_rows 
+          and jac_cols arrays.
+        - jac_shape : the global jacobian shape in blocks.
+        """
+        nodes_indicies = self.nodes_indicies
+        interface_map  = self.nested_interface_map
+        
+        def resolve(node):
+            while node in interface_map:
+                node = interface_map[node]
+            return nodes_indicies[node]
+        
+        # the blocks of the assembly own equations, i.e. the ground body.
+        rows, cols, _ = zip(*self.jac_equations.row_list())
+        jac_rows = [np.array(rows, dtype=np.int64)]
+        jac_cols = [np.array(cols, dtype=np.int64)]
+        
+        self.rows_offsets = {}
+        self.interface_indicies = {}
+        self.jac_slices = {}
+        row_offset = self.jac_equations.shape[0]
+        blocks_offset = len(rows)
+        for name, sub in self.nested_subsystems.items():
+            template = sub.template
+            indicies = np.array([resolve('%s%s'%(sub.prefix, n)) 
+                                 for n in template.nodes], dtype=np.int64)
+            # the template jacobian blocks pattern, including the symbolic 
+            # zero blocks, as ordered by the template numerical blocks.
+            rows, cols, _ = zip(*sub.jac_equations.row_list())
+            rows = np.array(rows, dtype=np.int64)
+            cols = np.array(cols, dtype=np.int64)
+            
+            jac_rows.append(rows + row_offset)
+            jac_cols.append(2*indicies[cols // 2] + cols % 2)
+            
+            self.rows_offsets[name] = row_offset
+            self.interface_indicies[name] = indicies
+            self.jac_slices[name] = slice(blocks_offset, blocks_offset + len(rows))
+            row_offset += sub.jac_equations.shape[0]
+            blocks_offset += len(rows)
+        
+        self.jac_rows = np.concatenate(jac_rows)
+        self.jac_cols = np.concatenate(jac_cols)
+        self.jac_shape = (row_offset, 2*len(nodes_indicies))
+    
     def _assemble_constraints_equations(self):
         
         nodelist = self.nodes
@@ -835,6 +1050,7 @@ class assembly(abstract_topology):
         equations[row_ind:row_ind+2,0] = b.normalized_pos_equation.blocks
         vel_rhs[row_ind:row_ind+2,0]   = b.normalized_vel_equation.blocks
         acc_rhs[row_ind:row_ind+2,0]   = b.normalized_acc_equation.blocks
+        self.constraints_indicies = {'ground': slice(row_ind, row_ind+2)}
             
         self.pos_equations = equations
         self.vel_equations = vel_rhs
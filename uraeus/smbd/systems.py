@@ -10,7 +10,8 @@ from .utilities.interfaces.systems import (standalone_topology,
                                            template_topology, 
                                            assembly, configuration, 
                                            load_pickled_data)
+from .symbolic.components.matrices import init_printing
         
 __all__ = ['standalone_topology', 'template_topology', 'assembly',
-           'configuration', 'load_pickled_data']
+           'configuration', 'load_pickled_data', 'init_printing']
 
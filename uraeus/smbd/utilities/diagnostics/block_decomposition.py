@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import itertools
+
+# 3rd party library imports
+import networkx as nx
+
+###############################################################################
+###############################################################################
+
+class block_decomposition(object):
+    """
+    A structural analysis of the constraints equations of an assembled
+    symbolic topology, that decomposes the system jacobian into an ordered
+    sequence of independent sub-problems using the Dulmage-Mendelsohn
+    decomposition of the jacobian block-sparsity.
+
+    Parameters
+    ----------
+    topology : abstract_topology
+        An assembled instance of the symbolic topology classes.
+
+    Attributes
+    ----------
+    blocks : list (of dict)
+        The square sub-problems of the system in a block-lower-triangular
+        order, where each sub-problem only depends on the coordinates solved
+        in the preceding sub-problems. Each block is a dict that holds the
+        scalar 'rows' and 'columns' sets of the sub-problem in the system
+        jacobian, as well as the names of the 'constraints' and 'bodies'
+        involved.
+    levels : list (of lists)
+        The indices of the blocks grouped by their solution level, where
+        blocks of the same level are independent of each-other and can be
+        solved in parallel.
+    underdetermined : dict
+        The rows and columns of the under-determined part of the system, e.g.
+        the coordinates of the un-actuated degrees of freedom.
+    overdetermined : dict
+        The rows and columns of the over-determined part of the system, e.g.
+        the redundant constraints.
+
+    Notes
+    -----
+    The jacobian blocks are assumed to be structurally dense, except for the
+    blocks that are symbolically zero.
+    """
+
+    def __init__(self, topology):
+        try:
+            topology = topology.topology
+        except AttributeError:
+            pass
+        self.topology = topology
+        self._set_scalar_layout()
+        self._construct_bipartite_graph()
+        self._decompose()
+
+    @property
+    def nblocks(self):
+        return len(self.blocks)
+
+    def _set_scalar_layout(self):
+        """
+        Map the vector-equations rows and the coordinates columns blocks of
+        the system jacobian to their scalar indices.
+        """
+        topology = self.topology
+
+        self._rows_names = {}
+        for name, rows in topology.constraints_indicies.items():
+            for i in range(rows.start, rows.stop):
+                self._rows_names[i] = name
+
+        self._rows_map = {}
+        row_ind = 0
+        for i in range(topology.pos_equations.shape[0]):
+            size = topology.pos_equations[i, 0].shape[0]
+            self._rows_map[i] = list(range(row_ind, row_ind + size))
+            row_ind += size
+
+        coordinates = topology._get_coordinates_indicies()
+        self._cols_map = {}
+        self._cols_names = {}
+        for i, n in enumerate(topology.nodes):
+            if n not in coordinates:
+                continue
+            R_cols, P_cols = coordinates[n][:3], coordinates[n][3:]
+            self._cols_map[2*i] = R_cols
+            self._cols_map[2*i+1] = P_cols
+            self._cols_names.update({c: n for c in coordinates[n]})
+
+        self._scalar_rows_names = {}
+        for i, rows in self._rows_map.items():
+            self._scalar_rows_names.update({r: self._rows_names[i] for r in rows})
+
+    def _construct_bipartite_graph(self):
+        jacobian = self.topology.jac_equations
+        graph = nx.Graph()
+        graph.add_nodes_from((('r', r) for r in self._scalar_rows_names), bipartite=0)
+        graph.add_nodes_from((('c', c) for c in self._cols_names), bipartite=1)
+        for i, j, block in jacobian.row_list():
+            if getattr(block, 'is_ZeroMatrix', False) or j not in self._cols_map:
+                continue
+            rows = self._rows_map[i]
+            cols = self._cols_map[j]
+            graph.add_edges_from((('r', r), ('c', c)) for r, c in itertools.product(rows, cols))
+        self.graph = graph
+
+    def _decompose(self):
+        graph = self.graph
+        rows = [n for n in graph if n[0] == 'r']
+        cols = [n for n in graph if n[0] == 'c']
+        matching = nx.bipartite.hopcroft_karp_matching(graph, top_nodes=rows)
+
+        # coarse decomposition: the under-determined part is reachable from
+        # the unmatched columns by alternating paths, where the over-determined
+        # part is reachable from the unmatched rows.
+        unmatched_cols = [c for c in cols if c not in matching]
+        unmatched_rows = [r for r in rows if r not in matching]
+        under = self._alternating_reach(unmatched_cols, matching)
+        over  = self._alternating_reach(unmatched_rows, matching)
+
+        self.underdetermined = self._block_data(under)
+        self.overdetermined  = self._block_data(over)
+
+        # fine decomposition: the strongly connected components of the square
+        # part directed graph, where each column points to the columns that
+        # depend on it through its matched row.
+        square = set(graph) - under - over
+        dependency_graph = nx.DiGraph()
+        square_cols = [c for c in cols if c in square]
+        dependency_graph.add_nodes_from(square_cols)
+        for c in square_cols:
+            r = matching[c]
+            dependency_graph.add_edges_from((other, c) for other in graph[r]
+                                            if other != c and other in square)
+
+        condensed = nx.condensation(dependency_graph)
+        order = list(nx.topological_sort(condensed))
+
+        self.blocks = []
+        block_index = {}
+        for k, component in enumerate(order):
+            members = condensed.nodes[component]['members']
+            nodes = set(members) | {matching[c] for c in members}
+            self.blocks.append(self._block_data(nodes))
+            block_index[component] = k
+
+        levels = {}
+        for component in order:
+            predecessors = condensed.predecessors(component)
+            levels[component] = max((levels[p] + 1 for p in predecessors), default=0)
+        self.levels = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        for component in order:
+            self.levels[levels[component]].append(block_index[component])
+
+    def _alternating_reach(self, sources, matching):
+        graph = self.graph
+        reached = set(sources)
+        stack = list(sources)
+        while stack:
+            node = stack.pop()
+            for neighbour in graph[node]:
+                if neighbour in reached or neighbour not in matching:
+                    continue
+                mate = matching[neighbour]
+                reached.update((neighbour, mate))
+                stack.append(mate)
+        return reached
+
+    def _block_data(self, nodes):
+        rows = sorted(n[1] for n in nodes if n[0] == 'r')
+        cols = sorted(n[1] for n in nodes if n[0] == 'c')
+        constraints = list(dict.fromkeys(self._scalar_rows_names[r] for r in rows))
+        bodies = list(dict.fromkeys(self._cols_names[c] for c in cols))
+        data = {'rows': rows, 'columns': cols,
+                'constraints': constraints, 'bodies': bodies}
+        return data
+
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import csv
+import collections
+
+# 3rd party library imports
+import sympy as sm
+
+# Local applicataion imports
+from ...symbolic.components.matrices import AbstractMatrix
+
+###############################################################################
+
+# Estimated number of floating-point operations needed to numerically evaluate
+# the symbolic matrix functions used in the equations.
+functions_flops = {'A' : 30, 'B' : 60, 'G' : 4, 'E' : 4,
+                   'Skew': 3, 'Triad': 40}
+
+# Matrix expressions that represent symbolic values, i.e. tree leaves.
+_leaves = (sm.MatrixSymbol, sm.Symbol, sm.Number, sm.Identity, sm.ZeroMatrix,
+           sm.MatrixSlice)
+
+###############################################################################
+###############################################################################
+
+def _args(expr):
+    """
+    Return the symbolic arguments of a given expression, skipping the
+    non-symbolic arguments stored by the custom symbolic classes.
+    """
+    if isinstance(expr, _leaves) and not isinstance(expr, sm.MatrixSlice):
+        return ()
+    if isinstance(expr, sm.MatrixSlice):
+        parent = expr.args[0]
+        return ((parent,) if isinstance(parent, sm.Basic) else ())
+    return tuple(arg for arg in expr.args if isinstance(arg, sm.Basic))
+
+def _op_name(expr):
+    """
+    Return the operation name of a given symbolic node, or None if the node is
+    a leaf.
+    """
+    if isinstance(expr, _leaves):
+        return None
+    if isinstance(expr, AbstractMatrix):
+        return expr.__class__.__name__
+    if isinstance(expr, (sm.Function, sm.Derivative)):
+        return 'FUNC'
+    if isinstance(expr, (sm.Tuple, sm.Lambda)):
+        return None
+    return expr.__class__.__name__.upper()
+
+
+def count_ops(expr):
+    """
+    Count the symbolic operations in a given expression.
+
+    Parameters
+    ----------
+    expr : sympy.Basic
+        A scalar or matrix symbolic expression.
+
+    Returns
+    -------
+    counts : collections.Counter
+        The number of occurrences of each operation type, e.g. 'MATMUL',
+        'MATADD', 'TRANSPOSE', 'FUNC' or a matrix function name like 'B'.
+    """
+    counts = collections.Counter()
+    stack  = [expr]
+    while stack:
+        node = stack.pop()
+        name = _op_name(node)
+        if name is not None:
+            counts[name] += 1
+        stack.extend(_args(node))
+    return counts
+
+def tree_depth(expr):
+    """
+    Evaluate the depth of the expression tree of a given expression, where
+    a leaf symbol has a depth of one.
+    """
+    args = _args(expr)
+    if len(args) == 0:
+        return 1
+    return 1 + max(tree_depth(arg) for arg in args)
+
+def cse_temporaries(expr):
+    """
+    Evaluate the number of temporaries generated by the common sub-expressions
+    elimination of a given expression.
+    """
+    replacements, reduced = sm.cse([expr], symbols=sm.numbered_symbols('z'))
+    return len(replacements)
+
+def estimate_flops(expr, seen=None):
+    """
+    Estimate the floating-point operations needed to evaluate a given
+    expression numerically, taking into account the matrices dimensions.
+
+    Parameters
+    ----------
+    expr : sympy.Basic
+        A scalar or matrix symbolic expression.
+    seen : set, optional
+        A set of the already evaluated sub-expressions. Repeated
+        sub-expressions are counted only once, mimicking the cost of the
+        expression after the common sub-expressions elimination.
+
+    Returns
+    -------
+    flops : int
+    """
+    if seen is None:
+        seen = set()
+    if expr in seen:
+        return 0
+    seen.add(expr)
+
+    args  = _args(expr)
+    flops = sum(estimate_flops(arg, seen) for arg in args)
+
+    if isinstance(expr, _leaves):
+        return flops
+
+    elif isinstance(expr, AbstractMatrix):
+        return flops + functions_flops.get(expr.__class__.__name__, 0)
+
+    elif isinstance(expr, sm.MatMul):
+        scalars  = [a for a in args if not getattr(a, 'is_Matrix', False)]
+        matrices = [a for a in args if getattr(a, 'is_Matrix', False)]
+        m, k = matrices[0].shape
+        for mat in matrices[1:]:
+            n = mat.shape[1]
+            flops += m * n * (2*k - 1)
+            k = n
+        if scalars:
+            flops += (len(scalars) - 1) + m * k
+        return flops
+
+    elif isinstance(expr, sm.MatAdd):
+        m, n = expr.shape
+        return flops + (len(args) - 1) * m * n
+
+    elif isinstance(expr, (sm.Add, sm.Mul)):
+        return flops + len(args) - 1
+
+    elif isinstance(expr, (sm.Pow, sm.Function, sm.Derivative)):
+        return flops + 1
+
+    return flops
+
+###############################################################################
+###############################################################################
+
+class equations_report(object):
+    """
+    A report of the computational cost of the equations of an assembled
+    symbolic topology, where every constraint block in the `pos_equations`,
+    `acc_equations` and `jac_equations` and every force block in the
+    `frc_equations` is measured.
+
+    Parameters
+    ----------
+    topology : abstract_topology
+        An assembled instance of the symbolic topology classes.
+
+    Attributes
+    ----------
+    records : list (of dict)
+        A list of the metrics of every equation block, where each record
+        holds the keys defined in the `fields` class attribute.
+
+    """
+
+    fields = ('name', 'class', 'equations', 'ops', 'depth', 'cse', 'flops')
+
+    def __init__(self, topology):
+        try:
+            topology = topology.topology
+        except AttributeError:
+            pass
+        self.topology = topology
+        self.records  = []
+        self._construct()
+
+    def group_by(self, key='name'):
+        """
+        Aggregate the report records by the given key.
+
+        Parameters
+        ----------
+        key : str, {'name', 'class', 'equations'}
+
+        Returns
+        -------
+        groups : list (of dict)
+            Aggregated records sorted descendingly by their estimated flops.
+        """
+        metrics = ('ops', 'cse', 'flops')
+        groups  = collections.OrderedDict()
+        for record in self.records:
+            value = record[key]
+            if value not in groups:
+                groups[value] = {key: value, 'ops': 0, 'depth': 0, 'cse': 0, 
+                                 'flops': 0}
+            group = groups[value]
+            group['depth'] = max(group['depth'], record['depth'])
+            for metric in metrics:
+                group[metric] += record[metric]
+        return sorted(groups.values(), key=lambda g: g['flops'], reverse=True)
+
+    def hotspots(self, n=10):
+        """
+        Return the `n` equation blocks of the highest estimated flops.
+        """
+        return sorted(self.records, key=lambda r: r['flops'], reverse=True)[:n]
+
+    def to_csv(self, file_path, key=None):
+        """
+        Export the report records as a CSV file.
+
+        Parameters
+        ----------
+        file_path : str
+            The path of the CSV file.
+        key : str, optional
+            If given, the aggregated records grouped by the given key are
+            exported instead of the detailed records.
+        """
+        if key is None:
+            records, fields = self.records, self.fields
+        else:
+            records = self.group_by(key)
+            fields  = (key,) + self.fields[3:]
+        with open(file_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(records)
+
+
+    def _construct(self):
+        self._construct_constraints_records()
+        self._construct_forces_records()
+
+    def _construct_constraints_records(self):
+        topology = self.topology
+        equations = {'pos': topology.pos_equations,
+                     'acc': topology.acc_equations,
+                     'jac': topology.jac_equations}
+
+        for name, rows in topology.constraints_indicies.items():
+            typ = self._get_constraint_class(name)
+            for label, matrix in equations.items():
+                blocks = list(matrix[rows, :].values())
+                self._add_record(name, typ, label, blocks)
+
+    def _construct_forces_records(self):
+        topology = self.topology
+        edges = topology.forces_graph.edges
+        for e in edges:
+            if 'obj' not in edges[e]:
+                continue
+            force = edges[e]['obj']
+            typ = edges[e]['class']
+            blocks = force.Qi.blocks[:, 0].tolist() + force.Qj.blocks[:, 0].tolist()
+            blocks = sum(blocks, [])
+            self._add_record(edges[e]['name'], typ, 'frc', blocks)
+
+    def _get_constraint_class(self, name):
+        topology = self.topology
+        if name in topology.nodes:
+            return topology.nodes[name]['class']
+        edge = topology._edges_map[name]
+        return topology.edges[edge]['class']
+
+    def _add_record(self, name, typ, label, blocks):
+        blocks = [b for b in blocks if not getattr(b, 'is_ZeroMatrix', False)]
+        seen = set()
+        counts = collections.Counter()
+        for block in blocks:
+            counts.update(count_ops(block))
+        record = {'name': name,
+                  'class': typ.__name__,
+                  'equations': label,
+                  'ops': sum(counts.values()),
+                  'depth': max([tree_depth(b) for b in blocks], default=0),
+                  'cse': sum(cse_temporaries(b) for b in blocks),
+                  'flops': sum(estimate_flops(b, seen) for b in blocks),
+                  'counts': dict(counts)}
+        self.records.append(record)
+
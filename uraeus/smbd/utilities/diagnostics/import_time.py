@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import sys
+import json
+import subprocess
+
+###############################################################################
+
+# The modules that should not be imported by the package import, as they are
+# only needed by the optional drawing helpers.
+lazy_modules = ('matplotlib', 'matplotlib.pyplot')
+
+_script = '''
+import sys, time, json
+t0 = time.perf_counter()
+import %s
+t1 = time.perf_counter()
+print(json.dumps({'time': t1 - t0, 'modules': sorted(sys.modules)}))
+'''
+
+def measure_import_time(module='uraeus.smbd.systems', repeat=5):
+    """
+    Measure the import time of a module in fresh python interpreters, i.e. 
+    the startup overhead of a worker process that imports the module.
+
+    Parameters
+    ----------
+    module : str, optional
+        The imported module name. Defaults to 'uraeus.smbd.systems'.
+    repeat : int, optional
+        The number of measurements. Defaults to 5.
+
+    Returns
+    -------
+    time : float
+        The best import time in seconds.
+    modules : list
+        The names of the modules loaded by the import.
+    """
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _script%module],
+                                check=True, capture_output=True, text=True)
+        result = json.loads(output.stdout.splitlines()[-1])
+        times.append(result['time'])
+    return min(times), result['modules']
+
+def check_import_time(module='uraeus.smbd.systems', budget=None, repeat=5):
+    """
+    Guard the import time of a module, by checking that none of the 
+    `lazy_modules` are imported, and that the import time is within the given 
+    budget.
+
+    Parameters
+    ----------
+    module : str, optional
+        The imported module name. Defaults to 'uraeus.smbd.systems'.
+    budget : float, optional
+        The maximum allowed import time in seconds. Not checked if not given.
+    repeat : int, optional
+        The number of measurements. Defaults to 5.
+
+    Returns
+    -------
+    time : float
+        The best import time in seconds.
+
+    Raises
+    ------
+    RuntimeError
+        If a lazy module is imported or the import time exceeds the budget.
+    """
+    time, modules = measure_import_time(module, repeat)
+    imported = [m for m in lazy_modules if m in modules]
+    if imported:
+        raise RuntimeError('Importing %r eagerly imports %s.'%(module, imported))
+    if budget is not None and time > budget:
+        raise RuntimeError('Importing %r took %.3f s, exceeding the budget of'
+                           ' %.3f s.'%(module, time, budget))
+    return time
+
+
+if __name__ == '__main__':
+    module = sys.argv[1] if len(sys.argv) > 1 else 'uraeus.smbd.systems'
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    print('%s imported in %.3f s'%(module, check_import_time(module, budget)))
+
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+
+# 3rd party library imports
+import numpy as np
+import scipy.linalg
+
+# Local applicataion imports
+from ...numerics.matrix_assembly import block_sparse_assembler
+
+###############################################################################
+###############################################################################
+
+class redundancy_analysis(object):
+    """
+    A diagnostic tool that detects the redundant constraints of a topology by
+    a numerical rank analysis of the system jacobian evaluated at the initial
+    configuration.
+
+    Parameters
+    ----------
+    topology : abstract_topology
+        The assembled symbolic topology, used to name the jacobian rows.
+    model : object
+        An instance of the numerical topology class generated from the given
+        symbolic topology, with its `config` set. The model is initialized if
+        it has not been initialized yet.
+    tol : float, optional
+        The tolerance of the singular values of the row-scaled jacobian used
+        to decide the numerical rank, and of the residuals of its unit rows
+        used to decide the redundant rows. Defaults to
+        `max(shape) * eps * max(singular_values)`.
+
+    Attributes
+    ----------
+    jacobian : numpy.ndarray
+        The dense system jacobian at the initial configuration.
+    singular_values : numpy.ndarray
+        The singular values of the row-scaled jacobian.
+    rank : int
+        The numerical rank of the jacobian.
+    rank_deficiency : int
+        The number of the jacobian rows minus its numerical rank, i.e. the
+        expected number of the redundant rows.
+    redundant_rows : list (of dict)
+        The jacobian scalar rows that are linearly dependent on the other
+        rows, each identified by its 'row' index, the 'constraint' name, the
+        constraint 'class' and the 'primitive' constraint equation.
+
+    Notes
+    -----
+    The jacobian rows are scaled to unit norms first, so that a single
+    tolerance is relative to each row regardless of the units of its
+    constraint. The numerical rank is evaluated from the singular values of
+    the scaled jacobian, where the redundant rows are selected by a
+    Gram-Schmidt QR factorization of the scaled rows, processing the bodies
+    rows first then the joints rows in their topological order. A row is
+    redundant if it lies within the span of the rows processed before it,
+    i.e. the redundancy is always reported on the last joint that closes a
+    dependent set of constraints. The report notes if the number of the
+    redundant rows differs from the rank deficiency, i.e. if the tolerance
+    is too close to the singular values to decide the redundancy.
+    """
+
+    def __init__(self, topology, model, tol=None):
+        try:
+            topology = topology.topology
+        except AttributeError:
+            pass
+        self.topology = topology
+        self.model = model
+        self.tol = tol
+
+        if not hasattr(model, 'jac_rows'):
+            model.initialize()
+
+        self._evaluate_jacobian()
+        self._set_rows_labels()
+        self._analyse()
+
+    @property
+    def is_redundant(self):
+        return len(self.redundant_rows) > 0
+
+    @property
+    def rank_deficiency(self):
+        return self.jacobian.shape[0] - self.rank
+
+    def report(self):
+        """
+        Return a text report of the redundant constraints.
+        """
+        shape = self.jacobian.shape
+        lines = ['Jacobian shape : %s x %s'%shape,
+                 'Numerical rank : %s'%self.rank,
+                 'Condition number : %.3e'%self.condition_number]
+        for r in self.redundant_rows:
+            lines.append('Redundant row %(row)s : %(constraint)s (%(class)s) -> %(primitive)s'%r)
+        if len(self.redundant_rows) != self.rank_deficiency:
+            lines.append('Inconclusive : %s redundant rows found, while the '
+                         'rank deficiency is %s!'
+                         %(len(self.redundant_rows), self.rank_deficiency))
+        return '\n'.join(lines)
+
+    @property
+    def condition_number(self):
+        s = self.singular_values
+        if s[-1] == 0:
+            return np.inf
+        return s[0] / s[-1]
+
+
+    def _evaluate_jacobian(self):
+        model = self.model
+        model.eval_jac_eq()
+        blocks = model.jac_eq_blocks
+        shape  = (model.nc, model.n)
+        rows   = np.asarray(model.jac_rows) - getattr(model, 'rows_offset', 0)
+        assembler = block_sparse_assembler(rows, model.jac_cols, blocks, shape)
+        self._assembler = assembler
+        self.jacobian = assembler.assemble(blocks).toarray()
+
+    def _set_rows_labels(self):
+        """
+        Label each scalar row of the jacobian with the name of its constraint
+        and its primitive constraint equation.
+        """
+        topology = self.topology
+        assembler = self._assembler
+        self.rows_labels = {}
+        for name, rows in topology.constraints_indicies.items():
+            typ = self._get_constraint_class(name)
+            primitives = getattr(typ, 'vector_equations', None)
+            for k, row_block in enumerate(range(rows.start, rows.stop)):
+                primitive = self._get_primitive_name(typ, primitives, k)
+                for i, row in enumerate(assembler.scalar_rows(row_block)):
+                    label = {'row': int(row), 'constraint': name,
+                             'class': typ.__name__,
+                             'primitive': '%s[%s]'%(primitive, i)}
+                    self.rows_labels[int(row)] = label
+
+    def _analyse(self):
+        jacobian = self.jacobian
+        norms = np.linalg.norm(jacobian, axis=1)
+        scaled = jacobian / np.where(norms > 0, norms, 1)[:, None]
+        self.singular_values = scipy.linalg.svdvals(scaled)
+        s = self.singular_values
+        tol = self.tol
+        if tol is None:
+            tol = max(scaled.shape) * np.finfo(np.float64).eps * s[0]
+        self.rank = int(np.sum(s > tol))
+
+        order = self._rows_order()
+        basis = np.zeros((scaled.shape[1], 0))
+        redundant = []
+        for row in order:
+            v = scaled[row, :]
+            # orthogonalizing twice against the basis for numerical stability.
+            r = v - basis.dot(basis.T.dot(v))
+            r = r - basis.dot(basis.T.dot(r))
+            norm = np.linalg.norm(r)
+            if norm <= tol:
+                redundant.append(row)
+            else:
+                basis = np.column_stack([basis, r / norm])
+        self.redundant_rows = [self.rows_labels[r] for r in sorted(redundant)]
+
+    def _rows_order(self):
+        topology = self.topology
+        bodies = []
+        joints = []
+        for name, rows in topology.constraints_indicies.items():
+            scalar_rows = [r for row_block in range(rows.start, rows.stop)
+                           for r in self._assembler.scalar_rows(row_block)]
+            (bodies if name in topology.nodes else joints).extend(scalar_rows)
+        return bodies + joints
+
+    def _get_constraint_class(self, name):
+        topology = self.topology
+        if name in topology.nodes:
+            return topology.nodes[name]['class']
+        edge = topology._edges_map[name]
+        return topology.edges[edge]['class']
+
+    @staticmethod
+    def _get_primitive_name(typ, primitives, k):
+        if primitives is None:
+            return ('normalization' if k == 0 and typ.nve == 1 else
+                    ('ground_position', 'ground_orientation')[k])
+        primitive = primitives[k]
+        args = [str(v) for v in vars(primitive).values()]
+        return '%s(%s)'%(primitive.__class__.__name__, ', '.join(args))
+
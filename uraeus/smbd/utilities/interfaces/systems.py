@@ -14,6 +14,9 @@ import sympy as sm
 # Local applicataion imports
 from . import _decorated_containers as containers
 from ..serialization.structural.json.configuration_encoder import generator
+from ..serialization.structural.binary.configuration_encoder import generator as binary_generator
+from ..serialization.structural.binary.topology_encoder import generator as topology_generator
+from ..serialization import inputs_tables
 from ...symbolic.systems import topology_classes as topology_classes
 from ...symbolic.systems import configuration_classes as cfg_cls
 
@@ -57,14 +60,22 @@ class template_topology(object):
     def add_force(self):
         return self._forces
     
-    def assemble(self):
-        self.topology.assemble_model()
+    def assemble(self, reorder=None):
+        self.topology.assemble_model(reorder)
             
     def save(self, dir_path=''):
         file = os.path.join(dir_path, '%s.stpl'%self.name)
         with open(file, 'wb') as f:
             cloudpickle.dump(self, f)
     
+    def save_structure(self, dir_path=''):
+        """
+        Save the assembled topology in a structural `.stpl.npz` file, that 
+        can be loaded without sympy using the `load_structural_topology`.
+        """
+        file = os.path.join(dir_path, '%s.stpl.npz'%self.name)
+        topology_generator(self.topology).write_structural_file(file)
+    
 ###############################################################################
 ###############################################################################
 
@@ -113,6 +124,14 @@ class assembly(object):
         file = '%s.sasm'%self.name
         with open(file, 'wb') as f:
             cloudpickle.dump(self, f)
+    
+    def save_structure(self, dir_path=''):
+        """
+        Save the assembled assembly in a structural `.sasm.npz` file, that 
+        can be loaded without sympy using the `load_structural_topology`.
+        """
+        file = os.path.join(dir_path, '%s.sasm.npz'%self.name)
+        topology_generator(self.topology).write_structural_file(file)
         
     def draw_constraints_topology(self):
         self.topology.draw_constraints_topology()
@@ -158,15 +177,40 @@ class configuration(object):
     def assign_geometry_to_body(self, body, geo, eval_inertia=True, mirror=False):
         self.config.assign_geometry_to_body(body, geo, eval_inertia, mirror)
     
+    def deferred_evaluation(self):
+        """
+        A context manager that defers the evaluation of the configuration 
+        nodes until their equalities are requested.
+        """
+        return self.config.deferred_evaluation()
+    
 
-    def extract_inputs_to_csv(self, path):
+    def extract_inputs_to_csv(self, path, n_rows=1):
         file_path = os.path.join(path, self.name)
-        inputs_dataframe = self.config.create_inputs_dataframe()
-        inputs_dataframe.to_csv('%s.csv'%file_path)
+        inputs_table = self.create_inputs_table(n_rows)
+        inputs_table.write_csv('%s.csv'%file_path)
+    
+    def create_inputs_table(self, n_rows=1):
+        """
+        Create a columnar table of the configuration user inputs, with the 
+        given number of rows, i.e. configurations, of default values.
+        """
+        return inputs_tables.inputs_table.from_configuration(self.config, n_rows)
     
-    def export_JSON_file(self, path=''):
+    def load_inputs_table(self, file_path):
+        """
+        Load a columnar table of the configuration user inputs from a '.csv' 
+        or '.npz' file.
+        """
+        return inputs_tables.read_inputs(file_path, self.config)
+    
+    def export_JSON_file(self, path='', compact=False):
         config_constructor = generator(self.config)
-        config_constructor.write_JSON_file(path)
+        config_constructor.write_JSON_file(path, compact)
+    
+    def export_binary_file(self, path='', table=None):
+        config_constructor = binary_generator(self.config)
+        config_constructor.write_binary_file(path, table)
     
     def save(self):
         file = '%s.scfg'%self.name
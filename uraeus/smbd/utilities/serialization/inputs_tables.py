@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import os
+
+# 3rd party library imports
+import numpy as np
+
+###############################################################################
+
+# Columns suffixes of the components of the user inputs, by the input shape.
+_components_names = {(3, 1): ('x', 'y', 'z'),
+                     (4, 1): ('e0', 'e1', 'e2', 'e3'),
+                     (3, 3): ('xx', 'xy', 'xz', 'yx', 'yy', 'yz', 'zx', 'zy', 'zz')}
+
+def columns_names(layout):
+    """
+    The names of the table columns of a given inputs layout, where each
+    component of a non-scalar input takes a column named as 'node.component',
+    e.g. 'hps_a.x'.
+    """
+    columns = []
+    for node, shape in layout:
+        if shape == ():
+            columns.append(node)
+            continue
+        size = int(np.prod(shape))
+        components = _components_names.get(shape, [str(i) for i in range(size)])
+        columns += ['%s.%s'%(node, c) for c in components]
+    return columns
+
+###############################################################################
+###############################################################################
+
+class inputs_table(object):
+    """
+    A columnar table of the numerical user inputs of a configuration, where
+    each row holds a complete set of inputs, i.e. a configuration, and each
+    column holds a single component of an input, e.g. 'hps_a.x'.
+
+    The table values are stored in a single 2D array that is read and
+    written in one pass, where the inputs values are extracted as
+    (n_rows, ...) views of the table array.
+
+    Parameters
+    ----------
+    layout : list
+        The (node, shape) tuples of the configuration inputs, as given by the
+        `abstract_configuration.inputs_layout`.
+    data : array_like, optional
+        The table values of shape (n_rows, n_columns). Defaults to a single
+        row of the default inputs values.
+    rows : list, optional
+        The names of the table rows. Defaults to the rows indices.
+
+    Examples
+    --------
+    >>> table = inputs_table.from_configuration(config, 100)
+    >>> table['hps_a'] += np.random.normal(0, 5, (100, 3, 1))
+    >>> table.write_csv('doe.csv')
+    >>> evaluator.evaluate_batch(inputs_table.read_csv('doe.csv', config).to_batch())
+    """
+
+    def __init__(self, layout, data=None, rows=None):
+        self.layout  = [(node, tuple(shape)) for node, shape in layout]
+        self.columns = columns_names(self.layout)
+
+        self._slices = {}
+        offset = 0
+        for node, shape in self.layout:
+            size = int(np.prod(shape))
+            self._slices[node] = (slice(offset, offset + size), shape)
+            offset += size
+
+        if data is None:
+            data = self._default_row()[None, :]
+        data = np.array(data, dtype=np.float64, ndmin=2)
+        if data.shape[1] != len(self.columns):
+            raise ValueError('Expected %s columns, got %s.'
+                             %(len(self.columns), data.shape[1]))
+        self.data = data
+        self.rows = (list(rows) if rows is not None
+                     else [str(i) for i in range(len(data))])
+
+    @classmethod
+    def from_configuration(cls, config, n_rows=1):
+        """
+        Create a table of the default inputs values of a given configuration.
+        """
+        config = getattr(config, 'config', config)
+        table = cls(config.inputs_layout)
+        table.data = np.repeat(table.data, n_rows, axis=0)
+        table.rows = [str(i) for i in range(n_rows)]
+        return table
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, node):
+        """
+        The values of a given input for all the table rows, as a view of shape
+        (n_rows, ...).
+        """
+        columns, shape = self._slices[node]
+        return self.data[:, columns].reshape((len(self.data),) + shape)
+
+    def __setitem__(self, node, values):
+        columns, shape = self._slices[node]
+        values = np.asarray(values, dtype=np.float64)
+        self.data[:, columns] = values.reshape((-1, columns.stop - columns.start))
+
+    def to_inputs(self, row=0):
+        """
+        The inputs of a given row, as a dict that maps the inputs names to
+        their values.
+        """
+        data = self.data[row]
+        return {node: data[columns].reshape(shape)
+                for node, (columns, shape) in self._slices.items()}
+
+    def to_batch(self):
+        """
+        The inputs of all the rows, as a dict that maps the inputs names to
+        their values of shape (n_rows, ...).
+        """
+        return {node: self[node] for node in self._slices}
+
+    def input_sets(self):
+        """
+        Iterate over the rows inputs, e.g. as the input sets of a parameter
+        sweep.
+        """
+        for row in range(len(self.data)):
+            yield self.to_inputs(row)
+
+    def write_csv(self, file_path):
+        """
+        Write the table into a CSV file, with a header of the columns names,
+        where the first column holds the rows names.
+        """
+        header = ','.join(['name'] + self.columns)
+        values = np.char.mod('%.17g', self.data)
+        lines = [','.join([name, *row]) for name, row in zip(self.rows, values)]
+        with open(file_path, 'w') as f:
+            f.write('\n'.join([header] + lines) + '\n')
+
+    def write_npz(self, file_path):
+        """
+        Write the table into a `.npz` file.
+        """
+        np.savez(file_path, data=self.data, columns=np.array(self.columns),
+                 rows=np.array(self.rows))
+
+    @classmethod
+    def read_csv(cls, file_path, config):
+        """
+        Read a table written by the `write_csv` method, or with the same
+        layout, where the columns are matched by their names to the inputs
+        of the given configuration.
+        """
+        with open(file_path) as f:
+            lines = f.read().splitlines()
+        header = lines[0].split(',')
+        lines  = [l.split(',', 1) for l in lines[1:] if l.strip()]
+        rows   = [l[0] for l in lines]
+        data   = np.loadtxt([l[1] for l in lines], delimiter=',',
+                            dtype=np.float64, ndmin=2)
+        return cls._from_columns(config, header[1:], data, rows)
+
+    @classmethod
+    def read_npz(cls, file_path, config):
+        """
+        Read a table written by the `write_npz` method.
+        """
+        with np.load(file_path) as f:
+            columns, data, rows = f['columns'].tolist(), f['data'], f['rows'].tolist()
+        return cls._from_columns(config, columns, data, rows)
+
+    @classmethod
+    def _from_columns(cls, config, columns, data, rows):
+        config = getattr(config, 'config', config)
+        table  = cls(config.inputs_layout)
+        table.data = np.repeat(table.data, len(data), axis=0)
+        table.rows = rows
+
+        positions = {name: i for i, name in enumerate(table.columns)}
+        unknown = [c for c in columns if c not in positions]
+        if unknown:
+            raise ValueError('Unknown inputs columns %s.'%unknown)
+        # the given columns are scattered into the table in a single step,
+        # where the missing columns keep their default values.
+        table.data[:, [positions[c] for c in columns]] = data
+        return table
+
+    def _default_row(self):
+        row = np.zeros((len(self.columns),), dtype=np.float64)
+        for node, (columns, shape) in self._slices.items():
+            if shape == ():
+                row[columns] = 1.0
+        return row
+
+###############################################################################
+###############################################################################
+
+def write_inputs(table, file_path):
+    """
+    Write an inputs table into a file, where the file format is deduced from
+    the file extension, either '.csv' or '.npz'.
+    """
+    extension = os.path.splitext(file_path)[-1]
+    if extension == '.csv':
+        table.write_csv(file_path)
+    elif extension == '.npz':
+        table.write_npz(file_path)
+    else:
+        raise ValueError('Unsupported file extension %r.'%extension)
+
+def read_inputs(file_path, config):
+    """
+    Read an inputs table from a '.csv' or '.npz' file.
+    """
+    extension = os.path.splitext(file_path)[-1]
+    if extension == '.csv':
+        return inputs_table.read_csv(file_path, config)
+    elif extension == '.npz':
+        return inputs_table.read_npz(file_path, config)
+    raise ValueError('Unsupported file extension %r.'%extension)
+
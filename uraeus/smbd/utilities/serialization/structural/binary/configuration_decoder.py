@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import json
+import struct
+
+# 3rd party library imports
+import numpy as np
+
+# Local applicataion imports
+from ...inputs_tables import inputs_table
+
+################################################################################
+# The binary configuration format, of the `.bcfg` files, is laid out as:
+#
+#   magic      : b'UCFG'
+#   version    : uint16
+#   header_len : uint32
+#   header     : utf-8 JSON text, padded with spaces to a 64 bytes boundary
+#   data       : little-endian float64 block of shape (n_rows, n_columns)
+#
+# where the header holds the configuration nodes, their constructors and 
+# dependency edges, and the layout of the numerical user inputs stored as 
+# columns of the data block, as the columns of an `inputs_table`.
+################################################################################
+
+MAGIC   = b'UCFG'
+VERSION = 1
+PREFIX  = struct.Struct('<4sHI')
+ALIGNMENT = 64
+
+def read_header(file_path):
+    """
+    Read the header of a binary configuration file.
+
+    Returns
+    -------
+    header : dict
+        The decoded header data.
+    offset : int
+        The offset of the numerical data block in bytes.
+    """
+    with open(file_path, 'rb') as f:
+        magic, version, length = PREFIX.unpack(f.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError('%r is not a binary configuration file.'%file_path)
+        if version > VERSION:
+            raise ValueError('Unsupported binary configuration version %s.'%version)
+        header = json.loads(f.read(length).decode('utf-8'))
+    return header, PREFIX.size + length
+
+################################################################################
+################################################################################
+
+class binary_configuration(object):
+    """
+    A configuration loaded from a binary configuration file, where the
+    numerical user inputs block is memory-mapped and only read from the disk
+    on access.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the `.bcfg` file.
+    mmap_mode : str, optional
+        The memory-map mode, as of `numpy.memmap`. Defaults to 'r'.
+
+    Attributes
+    ----------
+    information : dict
+        The topology and configuration names.
+    nodes : list
+        The names of the configuration nodes, in a topological order.
+    constructors : list
+        The names of the relations of the nodes, ordered as the nodes, where
+        the inputs nodes have None.
+    edges : numpy.ndarray
+        The (parent, child) indices of the nodes dependency edges, ordered as
+        the relations arguments.
+    attributes : list
+        The passed attributes of the edges, e.g. 'R' of a geometry.
+    functions : dict
+        The JSON data of the non-numerical user inputs, e.g. the actuation 
+        functions.
+    geometries_map : dict
+        The geometries nodes mapped to their bodies.
+    layout : list
+        The (node, shape) tuples of the numerical user inputs.
+    data : numpy.memmap
+        The numerical user inputs of shape (n_rows, n_columns).
+    """
+
+    def __init__(self, file_path, mmap_mode='r'):
+        header, offset = read_header(file_path)
+        self.header = header
+        self.information  = header['information']
+        self.nodes        = header['nodes']
+        self.constructors = header['constructors']
+        self.edges        = np.array(header['edges'], dtype=np.int64).reshape((-1, 2))
+        self.attributes   = header['attributes']
+        self.functions    = header['functions']
+        self.geometries_map = header['geometries_map']
+        self.layout = [(node, tuple(shape)) for node, shape in header['inputs']]
+        self.rows   = header['rows']
+
+        self.data = np.memmap(file_path, dtype=header['dtype'], mode=mmap_mode,
+                              offset=offset, shape=tuple(header['shape']))
+
+        self._slices = {}
+        start = 0
+        for node, shape in self.layout:
+            size = int(np.prod(shape))
+            self._slices[node] = (slice(start, start + size), shape)
+            start += size
+
+    def __len__(self):
+        return len(self.data)
+
+    def to_inputs(self, row=0):
+        """
+        The numerical inputs of a given row, as a dict that maps the inputs
+        names to their values, as views of the memory-mapped block.
+        """
+        data = self.data[row]
+        return {node: data[columns].reshape(shape)
+                for node, (columns, shape) in self._slices.items()}
+
+    def to_table(self):
+        """
+        The numerical inputs as an in-memory `inputs_table`.
+        """
+        return inputs_table(self.layout, np.asarray(self.data), self.rows)
+
+    def predecessors(self, node):
+        """
+        The names of the arguments nodes of a given node.
+        """
+        index = self.nodes.index(node)
+        return [self.nodes[i] for i in self.edges[self.edges[:, 1] == index, 0]]
+
+def load_binary_configuration(file_path, mmap_mode='r'):
+    return binary_configuration(file_path, mmap_mode)
+
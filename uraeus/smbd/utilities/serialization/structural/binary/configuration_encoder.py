@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import os
+import json
+
+# 3rd party library imports
+import numpy as np
+import networkx as nx
+
+# Local applicataion imports
+from ...inputs_tables import inputs_table
+from ..json.jsonify import JSONify
+from .configuration_decoder import MAGIC, VERSION, PREFIX, ALIGNMENT
+
+################################################################################
+################################################################################
+
+class generator(object):
+    """
+    A writer of the binary configuration format, a compact companion of the
+    JSON configuration format, where the configuration structure is stored
+    in a header, and the numerical user inputs are stored in a contiguous
+    float64 block that can be memory-mapped by the 
+    `configuration_decoder.binary_configuration` loader.
+
+    Parameters
+    ----------
+    sym_config : abstract_configuration
+        The symbolic configuration instance.
+    """
+
+    def __init__(self, sym_config):
+
+        self.config = sym_config
+        self.config.evaluate_pending()
+
+        self.configuration_name = self.config.name
+        self.topology_name = self.config.topology.name
+
+        self.graph  = self.config.graph
+        self.layout = self.config.inputs_layout
+        self.geometries_map = self.config.geometries_map
+
+    def write_binary_file(self, file_path='', table=None):
+        """
+        Write the configuration binary file.
+
+        Parameters
+        ----------
+        file_path : str, optional
+            The directory of the written file. Defaults to the current 
+            working directory.
+        table : inputs_table, optional
+            A table of the numerical user inputs to be stored, e.g. the 
+            configurations of a parameter sweep. Defaults to the inputs 
+            values of the symbolic configuration.
+        """
+        if table is None:
+            table = self.construct_inputs_table()
+        
+        header = self.construct_header(table)
+        header_text = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        padding = -(PREFIX.size + len(header_text)) % ALIGNMENT
+        header_text += b' '*padding
+
+        name = '%s.bcfg'%self.configuration_name
+        file_name = os.path.join(file_path, name)
+        with open(file_name, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, VERSION, len(header_text)))
+            f.write(header_text)
+            f.write(np.ascontiguousarray(table.data, dtype='<f8').tobytes())
+        return file_name
+
+    def construct_header(self, table):
+        information = {'topology_name': self.topology_name,
+                       'configuration_name': self.configuration_name,
+                       'subsystem_name': ''}
+        
+        graph = self.graph
+        nodes = list(nx.topological_sort(graph))
+        indices = {n: i for i, n in enumerate(nodes)}
+        numerical_inputs = {node for node, _ in self.layout}
+        
+        constructors = []
+        functions = {}
+        edges = []
+        attributes = []
+        for node in nodes:
+            if graph.in_degree(node) == 0:
+                constructors.append(None)
+                if node not in numerical_inputs:
+                    functions[node] = JSONify(graph.nodes[node]['equality'].rhs)
+                continue
+            constructors.append(JSONify(graph.nodes[node]['rhs_function']))
+            for parent, _, attribute in graph.in_edges(node, data='passed_attr'):
+                edges.append([indices[parent], indices[node]])
+                attributes.append(attribute)
+
+        header = {'information': information,
+                  'nodes': nodes,
+                  'constructors': constructors,
+                  'edges': edges,
+                  'attributes': attributes,
+                  'functions': functions,
+                  'geometries_map': self.geometries_map,
+                  'inputs': [[node, list(shape)] for node, shape in table.layout],
+                  'rows': [str(r) for r in table.rows],
+                  'dtype': '<f8',
+                  'shape': list(table.data.shape)}
+        return header
+
+    def construct_inputs_table(self):
+        """
+        A single row table of the numerical user inputs values, as defined
+        by the symbolic configuration.
+        """
+        table = inputs_table(self.layout)
+        for node, shape in self.layout:
+            value = self.graph.nodes[node]['equality'].rhs
+            table[node] = np.array(value, dtype=np.float64).reshape((1,) + shape)
+        return table
+
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import json
+
+# 3rd party library imports
+import numpy as np
+
+################################################################################
+
+VERSION = 1
+
+# The keys of the system matrices of an assembled topology, i.e. the position,
+# velocity and acceleration equations, the jacobian, the forces vector and 
+# the mass matrix.
+matrices_keys = ('pos', 'vel', 'acc', 'jac', 'frc', 'mass')
+
+################################################################################
+################################################################################
+
+class structural_topology(object):
+    """
+    An assembled topology loaded from its structural `.npz` file, written by
+    the `topology_encoder.generator`, without importing sympy or unpickling
+    python objects.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the `.npz` file.
+
+    Attributes
+    ----------
+    header : dict
+        The topology data, i.e. the graph nodes and edges, the index maps,
+        the symbols names and the constants expressions.
+    matrices : dict
+        The data of the system matrices, mapped by their keys, as dicts of
+        'shape', the 'rows' and 'cols' indices of the non-zero blocks, their
+        'exprs' expressions strings, and the 'rep_symbols' and 'rep_exprs' 
+        of the CSE replacements.
+    """
+
+    def __init__(self, file_path):
+        with np.load(file_path, allow_pickle=False) as f:
+            self.header = json.loads(f['header'].item())
+            if self.header['version'] > VERSION:
+                raise ValueError('Unsupported structural topology version %s.'
+                                 %self.header['version'])
+            fields = ('shape', 'rows', 'cols', 'exprs', 'rep_symbols', 'rep_exprs')
+            self.matrices = {key: {field: f['%s_%s'%(key, field)] for field in fields}
+                             for key in matrices_keys}
+        
+        self.name = self.header['name']
+        self.n  = self.header['n']
+        self.nc = self.header['nc']
+        self.nve = self.header['nve']
+        self.nodes_indicies = self.header['nodes_indicies']
+        self.constraints_indicies = {k: slice(*v) for k, v in 
+                                     self.header['constraints_indicies'].items()}
+
+    @property
+    def nodes(self):
+        return [n['name'] for n in self.header['nodes']]
+    
+    @property
+    def edges(self):
+        return [e['name'] for e in self.header['edges']]
+
+    def sparsity(self, key):
+        """
+        The sparsity pattern of a system matrix.
+
+        Parameters
+        ----------
+        key : str
+            The matrix key, one of 'pos', 'vel', 'acc', 'jac', 'frc' and 
+            'mass'.
+
+        Returns
+        -------
+        rows, cols : numpy.ndarray
+            The indices of the non-zero blocks.
+        shape : tuple
+            The matrix shape in blocks.
+        """
+        data = self.matrices[key]
+        return data['rows'], data['cols'], tuple(data['shape'].tolist())
+    
+    def expressions(self, key):
+        """
+        The expressions strings of the non-zero blocks of a system matrix, 
+        ordered as its sparsity pattern.
+        """
+        return self.matrices[key]['exprs'].tolist()
+    
+    def replacements(self, key):
+        """
+        The (symbol, expression) strings of the CSE replacements of a system
+        matrix, in their evaluation order.
+        """
+        data = self.matrices[key]
+        return list(zip(data['rep_symbols'].tolist(), data['rep_exprs'].tolist()))
+
+def load_structural_topology(file_path):
+    return structural_topology(file_path)
+
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import json
+
+# 3rd party library imports
+import numpy as np
+from sympy.printing.str import StrPrinter
+
+# Local applicataion imports
+from .topology_decoder import VERSION, matrices_keys
+
+################################################################################
+################################################################################
+
+class printer(StrPrinter):
+    """
+    A string printer of the symbolic expressions that prints the symbols by 
+    their raw names, i.e. valid python variable names, instead of their
+    latex-formated names.
+    """
+
+    def _print_Symbol(self, expr):
+        return getattr(expr, '_raw_name', expr.name)
+
+    _print_MatrixSymbol = _print_Symbol
+
+def _is_zero(expr):
+    return getattr(expr, 'is_ZeroMatrix', False) or expr == 0
+
+################################################################################
+################################################################################
+
+class generator(object):
+    """
+    A writer of the structural format of assembled symbolic topologies, that
+    stores the topology graph, the index maps, the sparsity patterns of the 
+    system matrices and their CSE output as plain arrays and expressions 
+    strings in a `.npz` file, that can be loaded by the 
+    `topology_decoder.structural_topology` loader without importing sympy
+    or unpickling python objects.
+
+    Parameters
+    ----------
+    sym_topology : abstract_topology
+        An assembled template-based, standalone or assembly topology.
+    """
+
+    def __init__(self, sym_topology):
+        if not hasattr(sym_topology, 'pos_equations'):
+            raise ValueError('Topology %r is not assembled.'%sym_topology.name)
+        self.topology = sym_topology
+        self.name = sym_topology.name
+        self.printer = printer()
+
+    def write_structural_file(self, file_name):
+        data = self.construct()
+        np.savez(file_name, **data)
+    
+    def construct(self):
+        data = {'header': np.array(json.dumps(self.construct_header()))}
+        for key in matrices_keys:
+            data.update(self.construct_matrix_data(key))
+        return data
+
+    def construct_header(self):
+        topology = self.topology
+        dump = self.printer.doprint
+
+        nodes = topology.nodes
+        nodes_data = [{'name': n,
+                       'class': nodes[n]['class'].__name__,
+                       'n': nodes[n]['n'],
+                       'nc': nodes[n]['nc'],
+                       'virtual': nodes[n].get('virtual', False)}
+                      for n in nodes]
+        edges = topology.edges
+        edges_data = [{'name': edges[e]['name'],
+                       'body_i': e[0],
+                       'body_j': e[1],
+                       'class': edges[e]['class'].__name__,
+                       'nc': edges[e]['nc'],
+                       'nve': edges[e]['nve'],
+                       'virtual': edges[e].get('virtual', False)}
+                      for e in edges]
+        
+        constraints_indicies = {k: [s.start, s.stop] for k, s in 
+                                topology.constraints_indicies.items()}
+
+        header = {'version': VERSION,
+                  'name': self.name,
+                  'class': topology.__class__.__name__,
+                  'n': topology.n,
+                  'nc': topology.nc,
+                  'nve': topology.nve,
+                  'nodes': nodes_data,
+                  'edges': edges_data,
+                  'nodes_indicies': topology.nodes_indicies,
+                  'constraints_indicies': constraints_indicies,
+                  'arguments_symbols': [dump(s) for s in topology.arguments_symbols],
+                  'runtime_symbols': [dump(s) for s in topology.runtime_symbols],
+                  'constants_symbols': [dump(s) for s in topology.constants_symbols],
+                  'constants': self._dump_equalities(topology.constants_symbolic_expr),
+                  'reactions_symbols': [dump(s) for s in topology.reactions_symbols]}
+        
+        if hasattr(topology, 'interface_map'):
+            header['interface_map'] = topology.interface_map
+            header['subsystems'] = {k: sub.template.name for k, sub in 
+                                    topology.subsystems.items()}
+            for attr in ('mapped_vir_coordinates', 'mapped_vir_velocities', 
+                         'mapped_vir_accelerations'):
+                header[attr] = self._dump_equalities(getattr(topology, attr))
+        return header
+    
+    def construct_matrix_data(self, key):
+        """
+        The sparsity pattern and the non-zero expressions of a system matrix,
+        e.g. the jacobian, as reduced by the topology CSE if performed.
+        """
+        equations = getattr(self.topology, '%s_equations'%key)
+        try:
+            replacements, (reduced,) = getattr(self.topology, '%s_rep'%key), \
+                                       getattr(self.topology, '%s_exp'%key)
+        except AttributeError:
+            replacements, reduced = [], equations
+        
+        # the pattern is taken from the un-reduced equations, as the CSE may
+        # replace the repeated zero blocks by temporary symbols.
+        pattern = [(i, j) for i, j, v in equations.row_list() if not _is_zero(v)]
+        dump = self.printer.doprint
+
+        data = {'%s_shape'%key: np.array(equations.shape, dtype=np.int64),
+                '%s_rows'%key: np.array([i for i, _ in pattern], dtype=np.int64),
+                '%s_cols'%key: np.array([j for _, j in pattern], dtype=np.int64),
+                '%s_exprs'%key: np.array([dump(reduced[i, j]) for i, j in pattern], dtype=str),
+                '%s_rep_symbols'%key: np.array([dump(s) for s, _ in replacements], dtype=str),
+                '%s_rep_exprs'%key: np.array([dump(e) for _, e in replacements], dtype=str)}
+        return data
+
+    def _dump_equalities(self, equalities):
+        dump = self.printer.doprint
+        return [[dump(eq.lhs), dump(eq.rhs)] for eq in equalities]
+
@@ -4,107 +4,17 @@
 """
 # Standard library imports
 import os
+import io
 import sys
 import json
-import inspect
+from collections.abc import Iterator
 
 # 3rd party library imports
 import sympy as sm
 
 # Local applicataion imports
-from .....symbolic.components.matrices import AbstractMatrix, vector, quatrenion
-from .....symbolic.systems.configuration_classes import Simple_geometry, Equal_to
-
-################################################################################
-
-class Encoder(json.JSONEncoder):
-    """
-    A subclass of the `json.JSONEncoder` that over-rides the `default` method
-    that calls a custom `JSONify` function that returns a compatibale type
-    that can be serialzed in JSON.
-    """
-    
-    def default(self, obj):
-        return JSONify(obj)
-
-################################################################################
-################################################################################
-
-def JSONify(instance):
-    """
-    A function that takes in a symbolic object or a class and returns a 
-    compatibale type that can be serialzed in JSON.
-
-    TODO:
-        DataTypes map
-    """
-
-    # check if the given instance is a class
-    if inspect.isclass(instance):
-        constructor = instance.__name__
-        return constructor
-    
-    # check if the given instance is a basic scalar data type that can be 
-    # understod by the JSON encoder directly.
-    if isinstance(instance, (str, float, int, bool)):
-        return instance
-    
-    # check if the given instance is a basic sequence/iterable data type that 
-    # can be understod by the JSON encoder directly.
-    elif isinstance(instance, dict):
-        return {k: JSONify(v) for k,v in instance.items()}
-    
-    elif isinstance(instance, list):
-        alias = [JSONify(value) for value in instance]
-        return alias
-    
-    elif isinstance(instance, (tuple, sm.Tuple)):
-        alias = tuple(JSONify(value) for value in instance)
-        return alias
-    
-    # Conversions of basic symbolic scalars / symbols to JSON
-    elif isinstance(instance, (sm.Number,)):
-        return float(instance)
-    
-    elif isinstance(instance, (vector, quatrenion, sm.Symbol)):
-        text = str(instance)
-        return text
-    
-    # Conversion of sympy matrices.
-    elif isinstance(instance, (sm.ImmutableDenseMatrix, sm.MutableDenseMatrix)):
-        if 1 in instance.shape:
-            alias = [JSONify(value) for value in instance]
-        else:
-            alias = [JSONify(value) for value in instance.tolist()]
-        data_object = {'constructor': 'array', 'args':  alias}
-        return data_object
-    
-    # Conversion of symbolic geometries.
-    elif isinstance(instance, tuple(Simple_geometry.__subclasses__())):
-        constructor = JSONify(instance.__class__)
-        args = [JSONify(arg) for arg in instance.args]
-        data_object = {'constructor': constructor, 'args':  args}
-        return data_object
-    
-    # Conversion of symbolic geometries.
-    elif isinstance(instance, tuple(AbstractMatrix.__subclasses__())):
-        constructor = JSONify(instance.__class__)
-        args = [JSONify(arg) for arg in instance.args]
-        data_object = {'constructor': constructor, 'args':  args}
-        return data_object
-    
-    # Conversion of Lambda functions.
-    elif isinstance(instance, (sm.Function, sm.Lambda)):
-        constructor = JSONify(instance.__class__)
-        args = [JSONify(arg) for arg in instance.args]
-        data_object = {'constructor': constructor, 'args':  args}
-        return data_object
-    
-    # Fall back to basic string message if datatype not included in previous
-    # casses.
-    else:
-        return 'Data type not supported'
-        
+from .....symbolic.systems.configuration_classes import Equal_to
+from .jsonify import Encoder, JSONify, write_JSON
 
 ################################################################################
 ################################################################################
@@ -144,29 +54,36 @@ class generator(object):
         self.mapped_vir_velocities  = flatten_equalities(self.mbs, 'mapped_vir_velocities')
         self.mapped_vir_accelerations = flatten_equalities(self.mbs, 'mapped_vir_accelerations')
     
-    def write_JSON_file(self, file_path=''):
+    def write_JSON_file(self, file_path='', compact=False):
         name = '%s.json'%self.name
         file_name = os.path.join(file_path, name)
-        json_text = self.dump_JSON_text()
-
         with open(file_name, 'w') as f:
-            f.write(json_text)
+            write_JSON(f, self.iter_sections(), compact)
         
-    def dump_JSON_text(self):
-        data = self.construct()
-        json_text = json.dumps(data, cls=Encoder, indent=4)
-        return json_text
+    def dump_JSON_text(self, compact=False):
+        text = io.StringIO()
+        write_JSON(text, self.iter_sections(), compact)
+        return text.getvalue()
     
     def construct(self):
         assembly_info = {}
-        assembly_info['assembly_name'] = self.name
-        assembly_info['subsystems'] = {k: sub.template.name for k, sub in self.subsystems.items()}
-        assembly_info['interface_map'] = self.interface_map
-        assembly_info['nodes_indicies'] = self.nodes_indicies
-        assembly_info['mapped_vir_coordinates'] = {str(eq.lhs): str(eq.rhs) for eq in self.mapped_vir_coordinates}
-        assembly_info['mapped_vir_velocities'] = {str(eq.lhs): str(eq.rhs) for eq in self.mapped_vir_velocities}
-        assembly_info['mapped_vir_accelerations'] = {str(eq.lhs): str(eq.rhs) for eq in self.mapped_vir_accelerations}
+        for key, value in self.iter_sections():
+            assembly_info[key] = dict(value) if isinstance(value, Iterator) else value
         return assembly_info
+    
+    def iter_sections(self):
+        """
+        Iterate over the (key, value) sections of the assembly data, where 
+        the mapped virtual coordinates are given as iterators of their 
+        equalities.
+        """
+        yield 'assembly_name', self.name
+        yield 'subsystems', {k: sub.template.name for k, sub in self.subsystems.items()}
+        yield 'interface_map', self.interface_map
+        yield 'nodes_indicies', self.nodes_indicies
+        yield 'mapped_vir_coordinates', ((str(eq.lhs), str(eq.rhs)) for eq in self.mapped_vir_coordinates)
+        yield 'mapped_vir_velocities', ((str(eq.lhs), str(eq.rhs)) for eq in self.mapped_vir_velocities)
+        yield 'mapped_vir_accelerations', ((str(eq.lhs), str(eq.rhs)) for eq in self.mapped_vir_accelerations)
 
     
     def construct_data_dict(self, nodes):
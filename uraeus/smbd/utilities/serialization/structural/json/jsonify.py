@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Khaled Ghobashy
+"""
+# Standard library imports
+import json
+from collections.abc import Iterator
+
+# 3rd party library imports
+import sympy as sm
+
+# Local applicataion imports
+from .....symbolic.components.matrices import AbstractMatrix, vector, quatrenion
+from .....symbolic.systems.configuration_classes import Simple_geometry
+
+################################################################################
+
+class Encoder(json.JSONEncoder):
+    """
+    A subclass of the `json.JSONEncoder` that over-rides the `default` method
+    that calls a custom `JSONify` function that returns a compatibale type
+    that can be serialzed in JSON.
+    """
+
+    def default(self, obj):
+        return JSONify(obj)
+
+################################################################################
+################################################################################
+
+class handlers_registry(object):
+    """
+    A registry of the JSON conversion handlers of the serialized types, where
+    a handler is a function that takes in an instance and returns a
+    compatibale type that can be serialzed in JSON.
+
+    The handlers are registered in a priority order, and the handler of a
+    given type is looked-up once, as the first registered handler of one of
+    its base classes, then cached for the subsequent calls.
+    """
+
+    def __init__(self):
+        self._handlers = []
+        self._cache = {}
+
+    def register(self, types, handler=None, first=False):
+        """
+        Register a handler for the given types. Can be used as a decorator if
+        the handler is not given.
+
+        Parameters
+        ----------
+        types : type or tuple of types
+            The types handled by the handler, including their sub-classes.
+        handler : callable, optional
+            The handler function.
+        first : bool, optional
+            Give the handler a priority over the already registered ones, e.g.
+            to over-ride the handling of specific types. Defaults to False.
+        """
+        if handler is None:
+            return lambda function: self.register(types, function, first) or function
+
+        types = types if isinstance(types, tuple) else (types,)
+        if first:
+            self._handlers.insert(0, (types, handler))
+        else:
+            self._handlers.append((types, handler))
+        self._cache.clear()
+
+    def lookup(self, cls):
+        try:
+            return self._cache[cls]
+        except KeyError:
+            pass
+        handler = _not_supported
+        for types, function in self._handlers:
+            if issubclass(cls, types):
+                handler = function
+                break
+        self._cache[cls] = handler
+        return handler
+
+    def __call__(self, instance):
+        return self.lookup(type(instance))(instance)
+
+
+registry = handlers_registry()
+
+def JSONify(instance):
+    """
+    A function that takes in a symbolic object or a class and returns a
+    compatibale type that can be serialzed in JSON, using the handler
+    registered for the instance type.
+    """
+    return registry.lookup(type(instance))(instance)
+
+################################################################################
+################################################################################
+
+def write_JSON(file, sections, compact=False):
+    """
+    Write a JSON object into an opened text file, member by member, without
+    building the whole object in memory.
+
+    Parameters
+    ----------
+    file : file object
+        The opened text file.
+    sections : iterable (of tuples)
+        The (key, value) members of the JSON object, where a value can be an
+        iterator of (key, value) members, e.g. a generator, that is streamed 
+        as a nested JSON object.
+    compact : bool, optional
+        Write the JSON text without indentation and whitespace. Defaults to 
+        False, i.e. indented by 4 spaces, as `json.dumps(..., indent=4)`.
+    """
+    if compact:
+        encoder = json.JSONEncoder(default=JSONify, separators=(',', ':'))
+    else:
+        encoder = json.JSONEncoder(default=JSONify, indent=4)
+    _write_members(file, encoder, sections, 1, compact)
+
+def _write_members(file, encoder, members, level, compact):
+    if compact:
+        opening, separator, closing, colon = '{', ',', '}', ':'
+    else:
+        indent = '\n' + ' '*4*level
+        opening, separator = '{' + indent, ',' + indent
+        closing, colon = '\n' + ' '*4*(level-1) + '}', ': '
+    
+    empty = True
+    for key, value in members:
+        file.write(opening if empty else separator)
+        file.write(encoder.encode(key) + colon)
+        if isinstance(value, Iterator):
+            _write_members(file, encoder, value, level+1, compact)
+        else:
+            text = encoder.encode(value)
+            file.write(text if compact else text.replace('\n', indent))
+        empty = False
+    file.write('{}' if empty else closing)
+
+################################################################################
+# The default handlers, registered in the order of their precedence.
+################################################################################
+
+def _not_supported(instance):
+    # Fall back to basic string message if datatype not registered.
+    return 'Data type not supported'
+
+def _constructor_data(instance):
+    constructor = instance.__class__.__name__
+    args = [JSONify(arg) for arg in instance.args]
+    data_object = {'constructor': constructor, 'args':  args}
+    return data_object
+
+# Classes are serialized by their names, where the classes are instances of
+# `type` or its sub-classes, i.e. metaclasses.
+@registry.register(type)
+def _class_name(instance):
+    return instance.__name__
+
+# Basic scalar data types that can be understod by the JSON encoder directly.
+@registry.register((str, float, int, bool))
+def _identity(instance):
+    return instance
+
+# Basic sequence/iterable data types.
+@registry.register(dict)
+def _dict(instance):
+    return {k: JSONify(v) for k,v in instance.items()}
+
+@registry.register(list)
+def _list(instance):
+    return [JSONify(value) for value in instance]
+
+@registry.register((tuple, sm.Tuple))
+def _tuple(instance):
+    return tuple(JSONify(value) for value in instance)
+
+# Conversions of basic symbolic scalars / symbols.
+@registry.register(sm.Number)
+def _number(instance):
+    return float(instance)
+
+@registry.register((vector, quatrenion, sm.Symbol))
+def _symbol(instance):
+    return str(instance)
+
+# Conversion of sympy matrices.
+@registry.register((sm.ImmutableDenseMatrix, sm.MutableDenseMatrix))
+def _matrix(instance):
+    if 1 in instance.shape:
+        alias = [JSONify(value) for value in instance]
+    else:
+        alias = [JSONify(value) for value in instance.tolist()]
+    data_object = {'constructor': 'array', 'args':  alias}
+    return data_object
+
+# Conversion of symbolic geometries, relations and Lambda functions.
+registry.register((Simple_geometry, AbstractMatrix, sm.Function, sm.Lambda),
+                  _constructor_data)
+